@@ -1,37 +1,197 @@
 # -*- coding: utf-8 -*-
 
+# Compare our conjugators against the prototypes in verbs-0-2-0.xml.
+#
+# By default, we walk the prototypes in order of frequency and stop at the
+# first mismatch.  With '--report FILE', we check every tense of every
+# prototype in parallel instead, and write a JSON report (or TSV, if FILE
+# ends in '.tsv') listing every mismatch, how much of our verb frequency
+# each result covers, and how long each conjugator took.
+
 from __future__ import print_function
 import sys
 import codecs
+import time
+import json
+import argparse
+import multiprocessing
+from collections import OrderedDict
 
 import sqlite3
 
 import prototype
 import conjugators
+import profiling
 
 # Python 2.7 is really unbearably stupid about Unicode.  Here is one of the
 # bigger patches we need to make: http://stackoverflow.com/questions/492483/
 sys.stdout = codecs.getwriter('utf8')(sys.stdout)
 
-# Open our database.
-conn = sqlite3.connect("lexique.sqlite3")
-
-# Register all the verbs found in our database, and dump some information.
-conjugators.register_verbs_from_database(conn)
-for conj in conjugators.ALL:
-    print("%s: %s" % (conj.name(), conj.summarize()))
-
-# Order our prototypes by coverage.
-prototypes = []
-query = """
-SELECT prototype FROM verbe
-  WHERE prototype IS NOT NULL
-  GROUP BY prototype
-  ORDER BY SUM(freqfilms2) DESC"""
-for row in conn.execute(query):
-    prototypes.append(prototype.BY_LABEL[row[0]])
-
-# Iterate over our prototypes until we hit a mismatch.
-for p in prototypes:
-    conj = conjugators.BY_LABEL[p.label]
-    conj.assert_matches_prototype(p)
+# Check a single prototype against its conjugator.  This runs in worker
+# processes, so it takes a label and returns plain data.
+def check_prototype(label):
+    p = prototype.BY_LABEL[label]
+    conj = conjugators.BY_LABEL[label]
+    result = OrderedDict([
+        ('label', label),
+        ('infinitive', p.infinitive),
+        ('conjugator', conj.__class__.__name__),
+        ('status', None),
+        ('seconds', 0.0),
+        ('mismatches', []),
+    ])
+    if isinstance(conj, conjugators.UnimplementedConjugator):
+        result['status'] = 'unimplemented'
+        return result
+    if not conj.IMPLEMENTED:
+        result['status'] = 'irregular'
+        return result
+
+    start = time.time()
+    try:
+        mismatches = conj.prototype_mismatches(p)
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = u'%s: %s' % (e.__class__.__name__, e)
+    else:
+        result['status'] = 'failed' if mismatches else 'passed'
+        result['mismatches'] = [
+            OrderedDict([('tense', tense), ('expected', expected), ('got', got)])
+            for (tense, expected, got) in mismatches]
+    result['seconds'] = time.time() - start
+    return result
+
+# Check every prototype, and return a report.
+def validate(conn, processes=None):
+    # How many verbs, and how much frequency, each prototype covers.
+    coverage = {}
+    query = """
+    SELECT prototype, COUNT(*), SUM(freqfilms2) FROM verbe
+      WHERE prototype IS NOT NULL
+      GROUP BY prototype"""
+    for (label, verbs, freq) in conn.execute(query):
+        coverage[label] = (verbs, freq or 0.0)
+
+    start = time.time()
+    labels = [p.label for p in prototype.PROTOTYPES]
+    pool = multiprocessing.Pool(processes)
+    try:
+        results = pool.map(check_prototype, labels)
+    finally:
+        pool.terminate()
+        pool.join()
+    elapsed = time.time() - start
+
+    # Attach coverage information to each result, and summarize it.
+    total_freq = sum(freq for (verbs, freq) in coverage.values()) or 1.0
+    statuses = OrderedDict()
+    by_conjugator = OrderedDict()
+    for result in results:
+        (verbs, freq) = coverage.get(result['label'], (0, 0.0))
+        result['verbs'] = verbs
+        result['freqfilms2'] = freq
+        result['coverage'] = freq / total_freq
+        summary = statuses.setdefault(result['status'], OrderedDict([
+            ('prototypes', 0), ('verbs', 0), ('coverage', 0.0)]))
+        summary['prototypes'] += 1
+        summary['verbs'] += verbs
+        summary['coverage'] += result['coverage']
+        timing = by_conjugator.setdefault(result['conjugator'], OrderedDict([
+            ('conjugator', result['conjugator']), ('prototypes', 0),
+            ('seconds', 0.0)]))
+        timing['prototypes'] += 1
+        timing['seconds'] += result['seconds']
+    results.sort(key=lambda r: -r['freqfilms2'])
+
+    return OrderedDict([
+        ('seconds', elapsed),
+        ('summary', statuses),
+        ('conjugators', by_conjugator.values()),
+        ('prototypes', results),
+    ])
+
+# Format the forms of a tense for a TSV report.  Participles are a single
+# list of alternatives, and other tenses have a list of alternatives for
+# each person.
+def _format_forms(tense, forms):
+    if dict(conjugators.TENSES)[tense] is None:
+        return u','.join(forms)
+    return u'/'.join(u','.join(alternatives) for alternatives in forms)
+
+# Write a report as tab-separated values, one row per prototype.
+def write_tsv(report, f):
+    columns = ['label', 'infinitive', 'conjugator', 'status', 'verbs',
+               'freqfilms2', 'coverage', 'seconds']
+    f.write(u'\t'.join(columns + ['mismatches']) + u'\n')
+    for result in report['prototypes']:
+        mismatches = u'; '.join(
+            u'%s: expected %s, got %s' %
+            (m['tense'], _format_forms(m['tense'], m['expected']),
+             _format_forms(m['tense'], m['got']))
+            for m in result['mismatches'])
+        row = [unicode(result[c]) for c in columns] + [mismatches]
+        f.write(u'\t'.join(row) + u'\n')
+
+# Run a full validation and write out a report.  Returns true if nothing
+# failed.
+def run_report(conn, path, processes):
+    report = validate(conn, processes)
+    with codecs.open(path, 'w', 'utf-8') as f:
+        if path.endswith('.tsv'):
+            write_tsv(report, f)
+        else:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+            f.write(u'\n')
+    for (status, summary) in report['summary'].items():
+        print("%-14s %4d prototypes, %5d verbs, %5.1f%% of frequency" %
+              (status, summary['prototypes'], summary['verbs'],
+               100 * summary['coverage']), file=sys.stderr)
+    print("Checked %d prototypes in %.2fs; wrote %s" %
+          (len(report['prototypes']), report['seconds'], path),
+          file=sys.stderr)
+    return not any(s in report['summary'] for s in ['failed', 'error'])
+
+# Walk our prototypes in order of coverage until we hit a mismatch.
+def run_until_mismatch(conn):
+    prototypes = []
+    query = """
+    SELECT prototype FROM verbe
+      WHERE prototype IS NOT NULL
+      GROUP BY prototype
+      ORDER BY SUM(freqfilms2) DESC"""
+    for row in conn.execute(query):
+        prototypes.append(prototype.BY_LABEL[row[0]])
+    for p in prototypes:
+        conj = conjugators.BY_LABEL[p.label]
+        conj.assert_matches_prototype(p)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--report', metavar='FILE',
+                        help='check everything and write a JSON/TSV report')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='number of worker processes (default: all cores)')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='write a JSON timing report to FILE')
+    args = parser.parse_args()
+    if args.profile:
+        profiling.enable(args.profile)
+
+    # Open our database.
+    conn = sqlite3.connect("lexique.sqlite3")
+
+    # Name our conjugators after verbs in our database, and dump some
+    # information.
+    with profiling.stage('analyze_prototypes: choosing example verbs'):
+        conjugators.choose_example_verbs_from_database(conn)
+        for conj in conjugators.ALL:
+            print("%s: %s" % (conj.name(), conj.summarize()))
+
+    with profiling.stage('analyze_prototypes: checking prototypes'):
+        if args.report:
+            ok = run_report(conn, args.report, args.processes)
+        else:
+            run_until_mismatch(conn)
+            ok = True
+    if not ok:
+        sys.exit(1)
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+# Type-ahead completion over lemmas and word forms, ranked by frequency and
+# ignoring accents, so that 'eleve' finds 'élève':
+#
+#     >>> completer = Completer.from_database(conn)
+#     >>> completer.complete(u'eleve')
+#     [(u'élève', 40.46), (u'élevé', 21.08), ...]
+#
+# We keep every word in an array sorted by its accent-free spelling, so the
+# words with a given prefix form one contiguous range we can find with
+# binary search.  For short prefixes, that range is large, so we also
+# precompute the best completions for every prefix matching more than a
+# handful of words.
+
+from bisect import bisect_left
+from heapq import nlargest
+from unicodedata import normalize, combining
+
+# Letters which don't decompose into a base letter plus accents.
+_LIGATURES = {u'œ': u'oe', u'æ': u'ae', u'ß': u'ss'}
+
+# Remove accents and case, so that u'Élève' becomes u'eleve'.
+def fold(word):
+    decomposed = normalize('NFD', unicode(word).lower())
+    return u''.join(_LIGATURES.get(c, c) for c in decomposed
+                    if not combining(c))
+
+class Completer(object):
+    # Precompute completions for prefixes matching more than this many
+    # words.  Smaller ranges are cheap enough to rank on the fly.
+    THRESHOLD = 64
+
+    # 'words' is an iterable of (word, frequency) pairs.  If a word appears
+    # more than once, we keep its highest frequency.
+    def __init__(self, words, k=10):
+        self.k = k
+        freqs = {}
+        for (word, freq) in words:
+            freq = freq or 0.0
+            if freq > freqs.get(word, -1.0):
+                freqs[word] = freq
+        entries = sorted((fold(w), w, f) for (w, f) in freqs.iteritems())
+        self.keys = [e[0] for e in entries]
+        self.words = [(e[1], e[2]) for e in entries]
+        self.top = {}
+        self._precompute()
+
+    # Build a completer from 'lemme_simple.lemme' and 'lexique.ortho',
+    # ranked by frequency in the specified corpus ('films' or 'livres').
+    @classmethod
+    def from_database(klass, conn, corpus='films', k=10):
+        freq = 'freqfilms2' if corpus == 'films' else 'freqlivres'
+        query = """SELECT lemme, %(freq)s FROM lemme_simple
+                   UNION ALL
+                   SELECT ortho, %(freq)s FROM lexique""" % {'freq': freq}
+        return klass(conn.execute(query), k)
+
+    # Rank a range of our words by frequency.
+    def _rank(self, lo, hi, k):
+        return nlargest(k, self.words[lo:hi], key=lambda wf: wf[1])
+
+    # Store the top completions for every prefix that matches more than
+    # THRESHOLD words.  Prefixes of each length divide our sorted keys
+    # into contiguous groups, so we make one pass per prefix length, and
+    # stop when every group is small.
+    def _precompute(self):
+        n = len(self.keys)
+        if n > self.THRESHOLD:
+            self.top[u''] = self._rank(0, n, self.k)
+        length = 1
+        while True:
+            found_large = False
+            lo = 0
+            while lo < n:
+                prefix = self.keys[lo][:length]
+                if len(prefix) < length:
+                    # This key is shorter than our prefixes, and the longer
+                    # keys after it which start with it belong to other
+                    # groups, so we can't skip past them.
+                    lo += 1
+                    continue
+                hi = self._end_of_prefix(prefix, lo)
+                if hi - lo > self.THRESHOLD:
+                    self.top[prefix] = self._rank(lo, hi, self.k)
+                    found_large = True
+                lo = hi
+            if not found_large:
+                break
+            length += 1
+
+    # The index just past the last key starting with 'prefix', searching
+    # from 'lo'.
+    def _end_of_prefix(self, prefix, lo=0):
+        return bisect_left(self.keys, prefix + u'\uffff', lo)
+
+    # Return up to 'k' (word, frequency) pairs starting with 'prefix',
+    # ignoring accents and case, most frequent first.
+    def complete(self, prefix, k=None):
+        if k is None:
+            k = self.k
+        prefix = fold(prefix)
+        if k <= self.k and prefix in self.top:
+            return self.top[prefix][:k]
+        lo = bisect_left(self.keys, prefix)
+        hi = self._end_of_prefix(prefix, lo)
+        return self._rank(lo, hi, k)
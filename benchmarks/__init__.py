@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+# Small benchmarks for the slow parts of our pipeline.  Run them from the
+# top-level directory, after running 'make', using something like:
+#
+#     python -m benchmarks.prototype_matching
+
+from __future__ import print_function
+import time
+
+# Call 'fn' repeatedly and return the fastest run, in seconds.  We take
+# the minimum because anything slower is just noise from other processes.
+def best_time(fn, repeat=3):
+    best = None
+    for i in range(repeat):
+        start = time.time()
+        fn()
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+# Print a single line of results in a consistent format.
+def report(name, count, seconds, unit='items'):
+    rate = count / seconds if seconds > 0 else float('inf')
+    print("%-30s %8d %s in %8.4fs (%12.0f %s/sec)" %
+          (name, count, unit, seconds, rate, unit))
+    return rate
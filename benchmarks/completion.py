@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+# Compare autocomplete.Completer with a SQL "LIKE 'pre%'" query, typing
+# each of a sample of words one keystroke at a time.
+
+from __future__ import print_function
+import time
+import random
+import sqlite3
+
+from autocomplete import Completer
+from benchmarks import best_time, report
+
+conn = sqlite3.connect("lexique.sqlite3")
+
+start = time.time()
+completer = Completer.from_database(conn)
+report('build', len(completer.keys), time.time() - start, 'words')
+
+# Make sure we precomputed every prefix which matches too many words.
+counts = {}
+for key in completer.keys:
+    for i in range(len(key) + 1):
+        counts[key[:i]] = counts.get(key[:i], 0) + 1
+large = [p for (p, count) in counts.items() if count > Completer.THRESHOLD]
+missing = [p for p in large if p not in completer.top]
+print("Precomputed %d of %d prefixes with more than %d words" %
+      (len(large) - len(missing), len(large), Completer.THRESHOLD))
+assert not missing, "Missing prefixes: %r" % sorted(missing)[:10]
+
+random.seed(42)
+words = [row[0] for row in conn.execute('SELECT lemme FROM lemme_simple')]
+prefixes = [w[:i] for w in random.sample(words, min(500, len(words)))
+            for i in range(1, len(w) + 1)]
+
+SQL = """SELECT lemme FROM lemme_simple WHERE lemme LIKE ?
+         ORDER BY freqfilms2 DESC LIMIT 10"""
+before = report('SQL LIKE', len(prefixes), best_time(
+    lambda: [conn.execute(SQL, (p + '%',)).fetchall() for p in prefixes]),
+    'keystrokes')
+after = report('Completer', len(prefixes), best_time(
+    lambda: [completer.complete(p) for p in prefixes]), 'keystrokes')
+print("Speedup: %.1fx (%.1f us per completion)" %
+      (after / before, 1e6 / after))
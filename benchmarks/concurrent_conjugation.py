@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+# Stress test for sharing our conjugators between threads.  We conjugate
+# every verb in our database once to get the expected paradigms, then
+# conjugate them all again from many threads at once, in a different
+# order in each thread, while another thread keeps picking example verbs
+# and summarizing our conjugators.  Every result must match, and the
+# conjugator names must stay the same:
+#
+#     python -m benchmarks.concurrent_conjugation --threads 16
+#
+# We make Python switch threads as often as it can, so that races which
+# would normally be rare show up quickly.  Exits with status 1 if any
+# result differs.
+
+from __future__ import print_function
+import sys
+import random
+import argparse
+import threading
+
+import sqlite3
+
+import prototype
+import conjugators
+from benchmarks import best_time, report
+
+# Conjugate 'verbs', a list of (infinitive, label) pairs, returning a list
+# of paradigms.  This finds each verb's prototype again, to exercise
+# prototype.match, too.
+def conjugate(verbs):
+    results = []
+    for (infinitive, label) in verbs:
+        p = prototype.match(infinitive)
+        results.append((p.label, conjugators.conjugate(p.label, infinitive)))
+    return results
+
+# Describe our conjugators, the way munge_data.py does.
+def summaries():
+    return [(c.name(), c.like(), c.summarize()) for c in conjugators.ALL]
+
+# Conjugate 'verbs' in a random order, 'rounds' times, and record every
+# result which differs from 'expected' in 'errors'.
+def conjugate_thread(verbs, expected, rounds, seed, errors):
+    order = list(range(len(verbs)))
+    random.Random(seed).shuffle(order)
+    shuffled = [verbs[i] for i in order]
+    for i in range(rounds):
+        for (j, result) in zip(order, conjugate(shuffled)):
+            if result != expected[j]:
+                errors.append((verbs[j][0], expected[j], result))
+
+# Keep picking example verbs and summarizing our conjugators until 'done'
+# is set, and record any summaries which differ from 'expected'.
+def naming_thread(conn_path, expected, done, errors):
+    conn = sqlite3.connect(conn_path)
+    while not done.is_set():
+        conjugators.choose_example_verbs_from_database(conn)
+        result = summaries()
+        if result != expected:
+            errors.append(('summaries', expected, result))
+
+def stress(database, verbs, threads, rounds):
+    conjugators.choose_example_verbs_from_database(sqlite3.connect(database))
+    expected = conjugate(verbs)
+    expected_summaries = summaries()
+
+    errors = []
+    done = threading.Event()
+    namer = threading.Thread(target=naming_thread,
+                             args=(database, expected_summaries, done, errors))
+    workers = [threading.Thread(target=conjugate_thread,
+                                args=(verbs, expected, rounds, seed, errors))
+               for seed in range(threads)]
+    def run():
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+    namer.start()
+    try:
+        seconds = best_time(run, repeat=1)
+    finally:
+        done.set()
+        namer.join()
+    report('%d threads' % threads, threads * rounds * len(verbs), seconds,
+           'verbs')
+    return errors
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--database', default='lexique.sqlite3')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--rounds', type=int, default=1,
+                        help='how many times each thread conjugates every verb')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.database)
+    verbs = conn.execute("""SELECT lemme, prototype FROM verbe
+                              WHERE prototype IS NOT NULL
+                              ORDER BY lemme""").fetchall()
+    sys.setcheckinterval(10)
+    errors = stress(args.database, verbs, args.threads, args.rounds)
+    for (what, expected, got) in errors[:10]:
+        print(u"MISMATCH: %s\n  Expected: %r\n  Got: %r" %
+              (what, expected, got))
+    if errors:
+        print("%d results differed" % len(errors))
+        sys.exit(1)
+    print("All results identical")
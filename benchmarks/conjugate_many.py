@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+
+# Measure how conjugators.conjugate_many scales with the number of worker
+# processes, using every verb in our database, and make sure that every
+# configuration returns exactly what the serial version returns.
+
+from __future__ import print_function
+import sys
+import multiprocessing
+import sqlite3
+
+import conjugators
+from benchmarks import best_time, report
+
+conn = sqlite3.connect("lexique.sqlite3")
+verbs = [row[0] for row in conn.execute('SELECT lemme FROM verbe')]
+
+expected = list(conjugators.conjugate_many(verbs))
+report('serial', len(verbs),
+       best_time(lambda: list(conjugators.conjugate_many(verbs))), 'verbs')
+
+# processes=1 is the serial path, which we timed above.
+counts = sorted(set([2, 4, multiprocessing.cpu_count()]) - set([1]))
+for processes in counts:
+    results = []
+    def run():
+        results[:] = conjugators.conjugate_many(verbs, processes=processes)
+    report('%d processes' % processes, len(verbs), best_time(run), 'verbs')
+    if results != expected:
+        print("Results differ with %d processes" % processes, file=sys.stderr)
+        sys.exit(1)
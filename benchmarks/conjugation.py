@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+
+# Measure how many forms/sec our conjugators generate for a few common
+# tenses, using every verb in our database which has a working conjugator.
+
+from __future__ import print_function
+import sqlite3
+
+import conjugators
+from benchmarks import best_time, report
+
+conn = sqlite3.connect("lexique.sqlite3")
+verbs = []
+for (lemme, label) in conn.execute(
+        'SELECT lemme, prototype FROM verbe WHERE prototype IS NOT NULL'):
+    conj = conjugators.BY_LABEL[label]
+    if conj.IMPLEMENTED:
+        verbs.append((conj, lemme))
+
+for tense in ['present', 'future', 'simple_past']:
+    def run():
+        for (conj, lemme) in verbs:
+            getattr(conj, tense)(lemme)
+    report(tense, 6 * len(verbs), best_time(run), 'forms')
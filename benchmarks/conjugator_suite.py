@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+
+# Measure forms/sec for every conjugator in conjugators.ALL, across all of
+# our ten tenses, plus end-to-end timings for munge_data.py and
+# choose_example_verbs_from_database, and compare them with a saved
+# baseline:
+#
+#     # Save a baseline before changing anything.
+#     python -m benchmarks.conjugator_suite --save
+#
+#     # Later, fail if anything got more than 20% slower.
+#     python -m benchmarks.conjugator_suite --tolerance 0.2
+#
+# Baselines depend on the machine and the data, so they aren't checked in.
+
+from __future__ import print_function
+import os
+import gc
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from collections import OrderedDict, defaultdict
+
+import sqlite3
+
+import prototype
+import conjugators
+import munge_data
+
+DEFAULT_BASELINE = os.path.join('benchmarks', 'conjugator_baseline.json')
+
+# Conjugate at most this many verbs per conjugator, most frequent first.
+MAX_VERBS = 100
+
+# Conjugators with fewer verbs than this are too quick to time on their
+# own, so we time them all together.
+MIN_VERBS = 10
+
+# Each measurement takes SAMPLES samples, and each sample is the best of
+# WINDOWS timed windows of WINDOW_SECONDS each.  See measure().
+WINDOW_SECONDS = 0.01
+WINDOWS = 3
+SAMPLES = 25
+
+# Return the number of forms in the result of a tense method.
+def count_forms(persons, result):
+    if persons is None:
+        return len(result)
+    return sum(len(alternatives) for alternatives in result)
+
+# A fixed amount of pure-Python string and dictionary work.  How fast our
+# machine is varies from run to run, so we compare everything else
+# relative to this.
+def calibrate():
+    table = {}
+    for i in xrange(10000):
+        word = u'verbe%d' % i
+        table[word[::-1]] = word.upper()
+    return len(table)
+
+# Call 'fn', which returns the number of items it produced, until at least
+# 'seconds' have passed, and return items/sec.
+def rate(fn, seconds):
+    count = 0
+    start = time.time()
+    while True:
+        count += fn()
+        elapsed = time.time() - start
+        if elapsed >= seconds:
+            return count / elapsed
+
+# Measure how fast 'fn' runs relative to calibrate().  How fast our
+# machine runs can change by 2x from one second to the next, so timing
+# calibrate() once and then everything else doesn't cancel anything out.
+# Instead, each sample times calibrate() and then 'fn' straight after it,
+# taking the best of WINDOWS short windows for each, so that both see the
+# same machine.  We return the median of SAMPLES such ratios.  Like
+# timeit, we turn off the garbage collector while timing, because
+# otherwise how long a collection takes depends on whatever else happens
+# to be in memory.
+def measure(name, fn):
+    fn()
+    ratios = []
+    gc.collect()
+    gc.disable()
+    try:
+        for i in range(SAMPLES):
+            base = max(rate(calibrate, WINDOW_SECONDS) for j in range(WINDOWS))
+            ratios.append(max(rate(fn, WINDOW_SECONDS)
+                              for j in range(WINDOWS)) / base)
+    finally:
+        gc.enable()
+    ratios.sort()
+    result = ratios[len(ratios) // 2]
+    print("%-40s %8.4f (samples %.4f to %.4f)" %
+          (name, result, ratios[0], ratios[-1]))
+    return result
+
+# Pick the verbs to conjugate with each conjugator: its verbs from our
+# database, or the infinitives of its prototypes if it has none.
+def verbs_by_conjugator(conn):
+    verbs = defaultdict(list)
+    for (lemme, label) in conn.execute(
+            """SELECT lemme, prototype FROM verbe
+                 WHERE prototype IS NOT NULL
+                 ORDER BY freqfilms2 DESC"""):
+        conj = conjugators.BY_LABEL[label]
+        if len(verbs[conj]) < MAX_VERBS:
+            verbs[conj].append(lemme)
+    examples = defaultdict(list)
+    for p in prototype.PROTOTYPES:
+        conj = conjugators.BY_LABEL[p.label]
+        if conj not in verbs:
+            examples[conj].append(p.infinitive)
+    verbs.update(examples)
+    return verbs
+
+# Conjugate every verb in 'verbs', a list of (conjugator, infinitive)
+# pairs, in every one of 'tenses'.  Returns the number of forms.
+def conjugate(verbs, tenses):
+    count = 0
+    for (conj, infinitive) in verbs:
+        for (tense, persons) in tenses:
+            count += count_forms(persons, getattr(conj, tense)(infinitive))
+    return count
+
+# Build our benchmarks: a list of (name, fn) pairs, where 'fn' returns
+# the number of items it produced.  We measure each implemented conjugator
+# with at least MIN_VERBS verbs across all ten tenses, all the others
+# together as 'small_conjugators', and each tense across all conjugators;
+# single tenses of single conjugators are too noisy to be useful.  We also
+# time choose_example_verbs_from_database and munge_data.munge, which runs
+# on 'scratch', a copy of our database.
+def build_suite(conn, scratch):
+    suite = []
+    verbs = verbs_by_conjugator(conn)
+    everything = []
+    small = []
+    for conj in conjugators.ALL:
+        if not conj.IMPLEMENTED or not verbs.get(conj):
+            continue
+        pairs = [(conj, v) for v in verbs[conj]]
+        everything.extend(pairs)
+        if len(pairs) < MIN_VERBS:
+            small.extend(pairs)
+            continue
+        suite.append((conj.__class__.__name__,
+                      lambda pairs=pairs: conjugate(pairs,
+                                                    conjugators.TENSES)))
+    if small:
+        suite.append(('small_conjugators',
+                      lambda: conjugate(small, conjugators.TENSES)))
+    for tense in conjugators.TENSES:
+        suite.append(('tense.' + tense[0],
+                      lambda tense=tense: conjugate(everything, [tense])))
+
+    count = conn.execute('SELECT COUNT(*) FROM verbe').fetchone()[0]
+    def choose():
+        conjugators.choose_example_verbs_from_database(conn)
+        return count
+    suite.append(('choose_example_verbs_from_database', choose))
+    suite.append(('munge_data', lambda: munge_data.munge(scratch)))
+    return suite
+
+# Compare 'results' with 'baseline'.  Returns a list of (name, baseline,
+# result) tuples for everything that got slower by more than 'tolerance'.
+def regressions(results, baseline, tolerance):
+    slower = []
+    for (name, value) in results.items():
+        old = baseline.get(name)
+        if old is not None and value < old * (1.0 - tolerance):
+            slower.append((name, old, value))
+    return slower
+
+# Run 'suite', and compare the results with 'baseline'.  Each result is
+# a rate relative to calibrate(), so that it doesn't depend on how fast
+# the machine happens to be right now.  Timings on a busy machine are
+# noisy, so we measure anything which looks slower up to 'retries' more
+# times, and keep its best result.  Returns our results and a list of
+# regressions.
+def run(suite, baseline, tolerance=0.2, retries=2):
+    results = OrderedDict((name, measure(name, fn)) for (name, fn) in suite)
+    for i in range(retries):
+        slower = set(name for (name, _, _) in
+                     regressions(results, baseline, tolerance))
+        if not slower:
+            break
+        print("Measuring %d slower results again..." % len(slower))
+        for (name, fn) in suite:
+            if name in slower:
+                results[name] = max(results[name], measure(name, fn))
+    return (results, regressions(results, baseline, tolerance))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--database', default='lexique.sqlite3')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='JSON file with saved results')
+    parser.add_argument('--save', action='store_true',
+                        help='save our results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed fractional drop in throughput')
+    parser.add_argument('--retries', type=int, default=2,
+                        help='how many times to re-measure slower results')
+    args = parser.parse_args()
+
+    baseline = {}
+    if not args.save and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+
+    conn = sqlite3.connect(args.database)
+    directory = tempfile.mkdtemp()
+    try:
+        scratch = os.path.join(directory, 'lexique.sqlite3')
+        shutil.copyfile(args.database, scratch)
+        suite = build_suite(conn, sqlite3.connect(scratch))
+        (results, slower) = run(suite, baseline, args.tolerance,
+                                args.retries)
+    finally:
+        shutil.rmtree(directory)
+
+    if args.save:
+        with open(args.baseline, 'w') as f:
+            json.dump(OrderedDict([('time', time.time()),
+                                   ('results', results)]), f, indent=2)
+            f.write('\n')
+        print("Saved baseline to %s" % args.baseline)
+    elif baseline:
+        for (name, old, new) in slower:
+            print("SLOWER: %-40s %8.4f -> %8.4f (%+.0f%%)" %
+                  (name, old, new, 100.0 * (new - old) / old))
+        new_names = [name for name in results if name not in baseline]
+        if new_names:
+            print("Not in baseline: %s" % ', '.join(new_names))
+        if slower:
+            print("%d of %d measurements regressed by more than %.0f%%" %
+                  (len(slower), len(results), 100 * args.tolerance))
+            sys.exit(1)
+        print("No regressions beyond %.0f%%" % (100 * args.tolerance))
+    else:
+        print("No baseline at %s; run with --save to create one" %
+              args.baseline)
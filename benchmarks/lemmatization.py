@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+# Measure how quickly lemmatizer.Lemmatizer can analyze verb forms, using
+# every form in our 'forme' table.  Before timing anything, we check that
+# each of those forms analyzes back to its verb, including the irregular
+# verbs we conjugate from templates.
+
+from __future__ import print_function
+import time
+import sqlite3
+
+from lemmatizer import Lemmatizer
+from benchmarks import best_time, report
+
+conn = sqlite3.connect("lexique.sqlite3")
+
+start = time.time()
+lemmatizer = Lemmatizer.from_database(conn)
+report('build index', len(lemmatizer.known), time.time() - start, 'verbs')
+
+for (form, infinitive) in [(u'est', u'être'), (u'avons', u'avoir'),
+                           (u'fait', u'faire'), (u'vont', u'aller')]:
+    found = [a[0] for a in lemmatizer.analyze(form)]
+    assert infinitive in found, "%s: got %r" % (form, found)
+
+query = 'SELECT lemme, temps, personne, forme FROM forme'
+missing = [(lemme, tense, person or None, form)
+           for (lemme, tense, person, form) in conn.execute(query)
+           if (lemme, tense, person or None) not in lemmatizer.analyze(form)]
+assert not missing, "Forms not analyzed: %r" % missing[:10]
+
+forms = [row[0] for row in conn.execute('SELECT forme FROM forme')]
+report('analyze', len(forms),
+       best_time(lambda: [lemmatizer.analyze(f) for f in forms]), 'forms')
+report('analyze_many', len(forms),
+       best_time(lambda: list(lemmatizer.analyze_many(forms))), 'forms')
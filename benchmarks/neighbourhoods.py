@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+# Compare neighbourhood densities from neighbours.NeighbourIndex with a
+# naive comparison of every pair of words.  The naive version is O(n^2),
+# so we run it on a random sample of words and check that both agree.
+
+from __future__ import print_function
+import sys
+import random
+import sqlite3
+
+from neighbours import NeighbourIndex, bounded_distance
+from benchmarks import best_time, report
+
+SAMPLE_SIZE = 1000
+
+def naive_densities(words, k):
+    return dict((a, sum(1 for b in words
+                        if a != b and bounded_distance(a, b, k) <= k))
+                for a in words)
+
+conn = sqlite3.connect("lexique.sqlite3")
+for column in ['ortho', 'phon']:
+    words = [row[0] for row in conn.execute(
+        "SELECT DISTINCT %s FROM lexique WHERE %s != ''" % (column, column))]
+    random.seed(42)
+    sample = random.sample(words, min(SAMPLE_SIZE, len(words)))
+
+    results = {}
+    def indexed():
+        results['indexed'] = NeighbourIndex(sample, 1).densities()
+    def naive():
+        results['naive'] = naive_densities(sample, 1)
+    before = report('%s naive' % column, len(sample),
+                    best_time(naive, 1), 'words')
+    after = report('%s indexed' % column, len(sample),
+                   best_time(indexed), 'words')
+    if results['indexed'] != results['naive']:
+        print("Densities differ for %s" % column, file=sys.stderr)
+        sys.exit(1)
+    print("Speedup: %.1fx" % (after / before))
+
+    # The index also scales to the whole lexicon.
+    report('%s indexed (all)' % column, len(words),
+           best_time(lambda: NeighbourIndex(words, 1).densities(), 1),
+           'words')
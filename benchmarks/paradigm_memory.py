@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+# Compare the memory used by the paradigms of every verb in 'verbe', stored
+# as Paradigm objects and as the old dictionaries of lists of lists.  We
+# add up sys.getsizeof for every distinct object we can reach, not counting
+# the infinitives, which the caller already has.
+
+from __future__ import print_function
+import sys
+import time
+import sqlite3
+
+import conjugators
+from conjugators.paradigm import Paradigm
+
+# The total size of 'obj' and everything it refers to, counting shared
+# objects once and skipping anything in 'seen'.
+def deep_size(obj, seen):
+    size = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple)):
+            stack.extend(o)
+        elif isinstance(o, Paradigm):
+            stack.extend([o.infinitive, o._slots])
+    return size
+
+conn = sqlite3.connect("lexique.sqlite3")
+verbs = []
+for (lemme, label) in conn.execute(
+        'SELECT lemme, prototype FROM verbe WHERE prototype IS NOT NULL'):
+    conj = conjugators.BY_LABEL[label]
+    if conj.IMPLEMENTED:
+        verbs.append((conj, lemme))
+
+def old_paradigm(conj, infinitive):
+    return dict((tense, getattr(conj, tense)(infinitive))
+                for (tense, persons) in conjugators.TENSES)
+
+# Tense names are shared by every dictionary, so don't count them.
+shared = set(id(tense) for (tense, persons) in conjugators.TENSES)
+shared.update(id(infinitive) for (conj, infinitive) in verbs)
+
+results = []
+for (name, build) in [('dict of lists', old_paradigm),
+                      ('Paradigm', lambda conj, v: conj.paradigm(v))]:
+    start = time.time()
+    paradigms = [build(conj, infinitive) for (conj, infinitive) in verbs]
+    elapsed = time.time() - start
+    size = deep_size(paradigms, set(shared)) - sys.getsizeof(paradigms)
+    results.append(size)
+    print("%-15s %6d verbs, %8.2f MB (%5d bytes/verb), built in %.2fs" %
+          (name, len(verbs), size / 1e6, size / max(len(verbs), 1), elapsed))
+print("Paradigm objects use %.0f%% less memory" %
+      (100.0 * (results[0] - results[1]) / results[0]))
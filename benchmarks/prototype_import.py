@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+# Measure how long it takes to import prototype.py in a fresh interpreter,
+# both with and without the cache of parsed prototypes.
+
+from __future__ import print_function
+import os
+import sys
+import subprocess
+
+import prototype
+from benchmarks import report
+
+# Time 'import prototype' in a new process, in seconds.
+SCRIPT = ("import time; start = time.time(); import prototype; "
+          "print(time.time() - start)")
+def import_time():
+    output = subprocess.check_output([sys.executable, '-c', SCRIPT])
+    return float(output)
+
+def remove_cache():
+    if os.path.exists(prototype.CACHE_PATH):
+        os.remove(prototype.CACHE_PATH)
+
+RUNS = 10
+
+cold = []
+for i in range(RUNS):
+    remove_cache()
+    cold.append(import_time())
+warm = [import_time() for i in range(RUNS)]
+
+before = report('import (no cache)', RUNS, sum(cold), 'imports')
+after = report('import (cached)', RUNS, sum(warm), 'imports')
+print("Speedup: %.1fx" % (after / before))
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+# Compare the linear scan over prototype.PROTOTYPES with prototype.match,
+# using every verb in our database.
+
+from __future__ import print_function
+import sys
+import sqlite3
+
+import prototype
+from benchmarks import best_time, report
+
+# The way munge_data.py used to find prototypes.
+def linear_match(infinitive):
+    for p in prototype.PROTOTYPES:
+        if p.matches(infinitive):
+            return p
+    return None
+
+conn = sqlite3.connect("lexique.sqlite3")
+verbs = [row[0] for row in conn.execute('SELECT lemme FROM verbe')]
+
+# Make sure both approaches agree before we time anything.
+for verb in verbs:
+    if linear_match(verb) is not prototype.match(verb):
+        print(u"Mismatch for %s" % verb, file=sys.stderr)
+        sys.exit(1)
+
+before = report('linear scan', len(verbs),
+                best_time(lambda: [linear_match(v) for v in verbs]), 'verbs')
+after = report('prototype.match', len(verbs),
+               best_time(lambda: [prototype.match(v) for v in verbs]), 'verbs')
+print("Speedup: %.1fx" % (after / before))
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+# Load-test server.py.  By default we start a server in this process on a
+# spare port, but you can point us at a running one with '--url'.  We
+# request a random mix of frequencies and paradigms for words in our
+# database, and report latency percentiles and requests/sec.
+
+from __future__ import print_function
+import time
+import random
+import urllib
+import urllib2
+import argparse
+import threading
+
+import lexique_db
+from benchmarks import report
+
+# Return the value at percentile 'p' (0-100) of a sorted list.
+def percentile(values, p):
+    index = int(round((len(values) - 1) * p / 100.0))
+    return values[index]
+
+# Build a list of paths to request.
+def sample_paths(count):
+    lemmes = [r[0] for r in lexique_db.rows(
+        'SELECT lemme FROM lemme_simple ORDER BY freqfilms2 DESC LIMIT 2000')]
+    verbs = [r[0] for r in lexique_db.rows(
+        'SELECT lemme FROM verbe ORDER BY freqfilms2 DESC LIMIT 2000')]
+    paths = []
+    for i in range(count):
+        if random.random() < 0.5:
+            word, endpoint = random.choice(lemmes), 'frequency'
+        else:
+            word, endpoint = random.choice(verbs), 'paradigm'
+        paths.append('/%s/%s' % (endpoint, urllib.quote(word.encode('utf-8'))))
+    return paths
+
+# Request each path in 'paths', appending latencies to 'latencies'.
+def worker(base_url, paths, latencies):
+    for path in paths:
+        start = time.time()
+        try:
+            urllib2.urlopen(base_url + path).read()
+        except urllib2.HTTPError as e:
+            e.read()
+        latencies.append(time.time() - start)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', help='URL of a running server')
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    random.seed(42)
+    if args.url:
+        base_url = args.url.rstrip('/')
+    else:
+        import server
+        httpd = server.make_server(port=0)
+        thread = threading.Thread(target=httpd.serve_forever)
+        thread.daemon = True
+        thread.start()
+        base_url = 'http://127.0.0.1:%d' % httpd.server_address[1]
+
+    paths = sample_paths(args.requests)
+    latencies = []
+    threads = [threading.Thread(target=worker,
+                                args=(base_url, paths[i::args.threads],
+                                      latencies))
+               for i in range(args.threads)]
+    start = time.time()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.time() - start
+
+    latencies.sort()
+    report('requests', len(latencies), elapsed, 'requests')
+    print("p50 latency: %.2f ms" % (1000 * percentile(latencies, 50)))
+    print("p99 latency: %.2f ms" % (1000 * percentile(latencies, 99)))
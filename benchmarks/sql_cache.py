@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+# Compare running a heavy notebook query with lexique_db.sql() directly,
+# and loading its result from the on-disk cache.  Needs pandas.
+
+from __future__ import print_function
+
+import lexique_db
+from benchmarks import best_time, report
+
+# The cumulative frequency query from our notebook.
+QUERY = """
+SELECT cgram, SUM(freqfilms2) AS freqfilms2
+  FROM (SELECT CASE WHEN cgram='AUX' THEN 'VER'
+                    ELSE SUBSTR(cgram, 1, 3)
+                    END AS cgram,
+               lemme, freqfilms2
+          FROM lemme)
+  GROUP BY cgram, lemme
+  ORDER BY cgram, freqfilms2 DESC
+"""
+
+count = len(lexique_db.sql(QUERY, cache=False))
+report('uncached', count, best_time(lambda: lexique_db.sql(QUERY, cache=False)),
+       'rows')
+lexique_db.sql(QUERY)
+report('cached', count, best_time(lambda: lexique_db.sql(QUERY)), 'rows')
+print("Cache: %r" % lexique_db.sql_cache().stats())
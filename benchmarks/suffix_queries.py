@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+# Compare suffixes.words_ending_with with a SQL "LIKE '%suffix'" query,
+# which can't use an index, for the endings of a sample of words.
+
+from __future__ import print_function
+import random
+import sqlite3
+
+import suffixes
+from benchmarks import best_time, report
+
+conn = sqlite3.connect("lexique.sqlite3")
+
+random.seed(42)
+words = [row[0] for row in conn.execute('SELECT ortho FROM lexique')]
+endings = [w[-n:] for w in random.sample(words, min(200, len(words)))
+           for n in (2, 3, 4) if len(w) > n]
+
+SQL = """SELECT ortho, SUM(freqfilms2) AS freq FROM lexique
+           WHERE ortho LIKE ? GROUP BY ortho ORDER BY freq DESC, ortho"""
+before = report('SQL LIKE', len(endings), best_time(
+    lambda: [conn.execute(SQL, ('%' + e,)).fetchall() for e in endings]),
+    'queries')
+after = report('ortho_inverse', len(endings), best_time(
+    lambda: [suffixes.words_ending_with(conn, e) for e in endings]),
+    'queries')
+print("Speedup: %.1fx" % (after / before))
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+# Compare conjugating every verb in our database with its conjugator and
+# with its prototype's templates, and check how often the two agree.  Only
+# verbs with a working conjugator are included, so that both approaches
+# do the same work.
+
+from __future__ import print_function
+import sqlite3
+
+import prototype
+import conjugators
+from conjugators import templates
+from benchmarks import best_time, report
+
+conn = sqlite3.connect("lexique.sqlite3")
+verbs = []
+for (lemme, label) in conn.execute(
+        'SELECT lemme, prototype FROM verbe WHERE prototype IS NOT NULL'):
+    conj = conjugators.BY_LABEL[label]
+    if conj.IMPLEMENTED:
+        verbs.append((conj, templates.for_prototype(prototype.BY_LABEL[label]),
+                      lemme))
+
+def count_forms(paradigms):
+    return sum(1 for paradigm in paradigms for form in paradigm.forms())
+
+def with_conjugators():
+    return [conj.paradigm(lemme) for (conj, template, lemme) in verbs]
+
+def with_templates():
+    return [template.paradigm(lemme) for (conj, template, lemme) in verbs]
+
+count = count_forms(with_conjugators())
+report('conjugators', count, best_time(with_conjugators), 'forms')
+report('templates', count, best_time(with_templates), 'forms')
+
+agree = sum(1 for (a, b) in zip(with_conjugators(), with_templates())
+            if a == b)
+print("Templates agree with conjugators for %d of %d verbs" %
+      (agree, len(verbs)))
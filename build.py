@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+
+# Build lexique.sqlite3, redoing only the work whose inputs have changed
+# since the last build.  We store a content hash of each input in the
+# 'empreinte' table:
+#
+#   donnees           the raw Lexique data, plus the scripts which load it
+#                     and derive 'lemme', 'verbe', 'couverture', etc.
+#   prototypes        the XML prototypes and the code which matches them
+#   forme:<lemme>     what the verb's forms in 'forme' were generated from:
+#                     the source of the conjugator class for its prototype,
+#                     including its base classes and any code at the top
+#                     level of their modules, or for prototypes without a
+#                     working conjugator, the prototype's templates
+#
+# If 'donnees' changes, we start from scratch.  Otherwise, we only match
+# verbs to prototypes again if 'prototypes' changed, and we only regenerate
+# the forms of verbs whose prototype or conjugator changed.  So editing one
+# rule class in re_conjugators.py only regenerates the verbs it handles.
+#
+#     python build.py            # what 'make' runs
+#     python build.py --full     # rebuild everything
+
+from __future__ import print_function
+import os
+import io
+import sys
+import ast
+import time
+import hashlib
+import inspect
+import argparse
+
+import sqlite3
+
+import load_lexique
+import createdb
+import suffixes
+import compute_coverage
+import prototype
+import conjugators
+import munge_data
+import materialize_forms
+import profiling
+
+# Scripts which build our tables from the raw data.
+DATA_SCRIPTS = ['load_lexique.py', 'createdb.py', 'createdb.sql',
+                'suffixes.py', 'compute_coverage.py']
+
+# Everything which affects which prototype each verb gets.
+PROTOTYPE_INPUTS = [prototype.XML_PATH, 'prototype.py', 'munge_data.py']
+
+# Scripts which affect the forms of every verb: how we store them, and how
+# we pick between conjugators and prototype templates.
+FORM_SCRIPTS = ['materialize_forms.py', 'conjugators/__init__.py',
+                'conjugators/bulk.py', 'conjugators/paradigm.py',
+                'conjugators/templates.py']
+
+# If more than this fraction of verbs need new forms, regenerate the whole
+# 'forme' table, which is faster than deleting and reinserting.
+FULL_FORMS_FRACTION = 0.5
+
+# Hash the contents of a list of files.
+def hash_files(paths):
+    h = hashlib.sha1()
+    for path in paths:
+        h.update(path.encode('utf-8') + b'\0')
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+        h.update(b'\0')
+    return h.hexdigest()
+
+# Split the source of a module into the source of each top-level class
+# (including its decorators), and everything else.  Returns a dictionary
+# mapping class names to source, and a string with everything else.
+_module_parts = {}
+def _split_module(module):
+    path = inspect.getsourcefile(module)
+    if path not in _module_parts:
+        with io.open(path, encoding='utf-8') as f:
+            lines = f.read().splitlines(True)
+        nodes = ast.parse(u''.join(lines).encode('utf-8')).body
+        starts = [min([n.lineno] + [d.lineno for d in
+                                    getattr(n, 'decorator_list', [])]) - 1
+                  for n in nodes]
+        ends = starts[1:] + [len(lines)]
+        classes = {}
+        rest = lines[:starts[0]] if starts else lines
+        for (node, start, end) in zip(nodes, starts, ends):
+            if isinstance(node, ast.ClassDef):
+                classes[node.name] = u''.join(lines[start:end])
+            else:
+                rest.extend(lines[start:end])
+        _module_parts[path] = (classes, u''.join(rest))
+    return _module_parts[path]
+
+# Hash the source code which determines how 'conj' conjugates verbs: its
+# class and base classes, and the rest of the modules which define them.
+# Verbs whose conjugator isn't implemented are conjugated from the
+# templates of prototype 'p' instead, so we hash those, too.  The code
+# which does that is in FORM_SCRIPTS.
+def conjugator_hash(conj, p=None):
+    h = hashlib.sha1()
+    for klass in type(conj).__mro__:
+        if klass is object:
+            continue
+        (classes, rest) = _split_module(sys.modules[klass.__module__])
+        h.update(klass.__module__ + '.' + klass.__name__ + '\0')
+        h.update(classes[klass.__name__].encode('utf-8') + b'\0')
+        h.update(rest.encode('utf-8') + b'\0')
+    if not conj.IMPLEMENTED and p is not None:
+        for (key, value) in sorted(vars(p).items()):
+            if not key.startswith('_'):
+                h.update(repr((key, value)) + b'\0')
+    return h.hexdigest()
+
+def load_hashes(conn):
+    conn.execute("""CREATE TABLE IF NOT EXISTS empreinte (
+                      cle TEXT PRIMARY KEY,
+                      valeur TEXT)""")
+    return dict(conn.execute('SELECT cle, valeur FROM empreinte'))
+
+def save_hashes(conn, hashes):
+    conn.execute('DELETE FROM empreinte')
+    conn.executemany('INSERT INTO empreinte VALUES (?, ?)',
+                     sorted(hashes.items()))
+    conn.commit()
+
+# Run 'step' and print how long it took.
+def timed(description, step, *args):
+    print("%s..." % description, file=sys.stderr)
+    start = time.time()
+    with profiling.stage('build: ' + description):
+        result = step(*args)
+    print("  %.2fs" % (time.time() - start), file=sys.stderr)
+    return result
+
+# Build everything that comes from the raw data, from scratch.
+def build_data(database, source):
+    if os.path.exists(database):
+        os.remove(database)
+    conn = sqlite3.connect(database)
+    timed("Loading raw data", load_lexique.load, conn, source)
+    with io.open('createdb.sql', encoding='utf-8') as f:
+        createdb.print_timings(
+            timed("Running createdb.sql", createdb.run, conn, f.read()))
+    timed("Indexing word endings", suffixes.build, conn)
+    timed("Computing text coverage", compute_coverage.compute, conn)
+    return conn
+
+# Return a list of (lemme, prototype) pairs for the verbs in 'verbe', most
+# frequent first, as stored by a previous build, just like
+# munge_data.match_prototypes.
+def stored_prototypes(conn):
+    matches = []
+    for (verb, label) in conn.execute(
+            'SELECT lemme, prototype FROM verbe ORDER BY freqfilms2 DESC'):
+        if label is not None:
+            matches.append((verb, prototype.BY_LABEL[label]))
+    return matches
+
+# Bring 'database' up to date.  If 'full' is true, rebuild everything.
+def build(database='lexique.sqlite3', source=None, full=False):
+    if source is None:
+        source = os.path.join('Lexique380', 'Bases+Scripts', 'Lexique380.txt')
+    hashes = {
+        'donnees': hash_files([source] + DATA_SCRIPTS),
+        'prototypes': hash_files(PROTOTYPE_INPUTS),
+    }
+    forms_hash = hash_files(FORM_SCRIPTS)
+
+    old = {}
+    if os.path.exists(database) and not full:
+        conn = sqlite3.connect(database)
+        old = load_hashes(conn)
+    if old.get('donnees') != hashes['donnees']:
+        conn = build_data(database, source)
+        load_hashes(conn)
+        old = {}
+    else:
+        print("Raw data unchanged", file=sys.stderr)
+
+    # Match verbs to prototypes, if anything which affects that changed.
+    if old.get('prototypes') != hashes['prototypes']:
+        matches = timed("Matching prototypes",
+                        munge_data.match_prototypes, conn)
+    else:
+        print("Prototypes unchanged", file=sys.stderr)
+        matches = stored_prototypes(conn)
+    timed("Updating verbe", munge_data.munge, conn, matches)
+
+    # Work out which verbs need new forms.  We compare with the hashes we
+    # saved along with 'forme', and not with the prototypes in 'verbe',
+    # because a build which stopped after updating 'verbe' would have
+    # left 'forme' behind it.  Verbs which lost their prototype just have
+    # their forms removed.
+    labels = dict((verb, p.label) for (verb, p) in matches)
+    label_hashes = {}
+    for label in set(labels.values()):
+        conj_hash = conjugator_hash(conjugators.BY_LABEL[label],
+                                    prototype.BY_LABEL[label])
+        label_hashes[label] = hashlib.sha1(conj_hash + forms_hash).hexdigest()
+    for (verb, label) in labels.iteritems():
+        hashes['forme:' + verb] = label_hashes[label]
+    stale = set(key[len('forme:'):] for key in old
+                if key.startswith('forme:') and key not in hashes)
+    stale.update(verb for verb in labels
+                 if hashes['forme:' + verb] != old.get('forme:' + verb))
+
+    if len(stale) > FULL_FORMS_FRACTION * max(len(labels), 1):
+        count = timed("Generating forms for all verbs",
+                      materialize_forms.materialize, conn)
+    elif stale:
+        print("%d verbs changed" % len(stale), file=sys.stderr)
+        count = timed("Generating forms for changed verbs",
+                      materialize_forms.update, conn,
+                      [(verb, labels.get(verb)) for verb in sorted(stale)])
+    else:
+        print("Conjugators unchanged", file=sys.stderr)
+        count = 0
+
+    save_hashes(conn, hashes)
+    conn.close()
+    return count
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('database', nargs='?', default='lexique.sqlite3')
+    parser.add_argument('--source', default=None,
+                        help='the raw Lexique380.txt file')
+    parser.add_argument('--full', action='store_true',
+                        help='rebuild everything, even if nothing changed')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='write a JSON timing report to FILE')
+    args = parser.parse_args()
+    if args.profile:
+        profiling.enable(args.profile)
+
+    start = time.time()
+    build(args.database, args.source, args.full)
+    # Let make know we're up to date, even if we didn't change anything.
+    os.utime(args.database, None)
+    print("Built %s in %.2fs" % (args.database, time.time() - start),
+          file=sys.stderr)
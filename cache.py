@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+# Caches for expensive lookups.
+
+import os
+import hashlib
+import tempfile
+import threading
+import cPickle
+from collections import OrderedDict
+
+# The file name extension for DiskCache entries.
+_SUFFIX = '.pickle'
+
+# A thread-safe, bounded, least-recently-used cache.
+class LRUCache(object):
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Return the cached value for 'key', calling 'compute()' to create it
+    # if necessary.  We don't hold our lock while computing, so two threads
+    # may occasionally compute the same value.
+    def get(self, key, compute):
+        with self._lock:
+            if key in self._items:
+                value = self._items.pop(key)
+                self._items[key] = value
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._items[key] = value
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+        return value
+
+    def __len__(self):
+        return len(self._items)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    # Summarize how well the cache is working.
+    def stats(self):
+        return {'size': len(self._items), 'max_size': self.max_size,
+                'hits': self.hits, 'misses': self.misses}
+
+# A bounded, least-recently-used cache of pickled values, stored one per
+# file in 'directory' so that it survives restarts.  Every key belongs to
+# a 'version', like the contents of a database: once somebody stores a
+# value for a new version, we delete the entries for every other version.
+# We use file modification times to find the least recently used entries,
+# and drop them once the cache takes up more than 'max_bytes'.
+#
+# Each get returns a freshly unpickled value, so callers are free to
+# modify it.  If we can't read or write the directory, we just compute
+# everything.
+class DiskCache(object):
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key, version):
+        digest = hashlib.sha1(repr(key)).hexdigest()
+        return os.path.join(self.directory, '%s-%s%s' %
+                            (version, digest, _SUFFIX))
+
+    # Return the cached value for 'key' and 'version', calling 'compute()'
+    # to create it if necessary.  'key' must have a stable repr, like a
+    # tuple of strings and numbers.
+    def get(self, key, compute, version='0'):
+        path = self._path(key, version)
+        try:
+            with open(path, 'rb') as f:
+                value = cPickle.load(f)
+        except (IOError, OSError):
+            pass
+        except Exception:
+            # A damaged entry, perhaps from a crash.  Forget it.
+            self._remove(path)
+        else:
+            self._touch(path)
+            with self._lock:
+                self.hits += 1
+            return value
+        with self._lock:
+            self.misses += 1
+        value = compute()
+        self._store(path, version, value)
+        return value
+
+    def _touch(self, path):
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    # Write 'value' to a temporary file and rename it into place, so that
+    # readers never see half an entry.
+    def _store(self, path, version, value):
+        data = cPickle.dumps(value, cPickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            return
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            (fd, tmp_path) = tempfile.mkstemp(dir=self.directory,
+                                              suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.rename(tmp_path, path)
+        except (IOError, OSError):
+            return
+        self._evict(version)
+
+    # Return a list of (mtime, size, path, version) for our entries.
+    def _entries(self):
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return entries
+        for name in names:
+            if not name.endswith(_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path,
+                            name.split('-', 1)[0]))
+        return entries
+
+    # Delete entries for other versions, and then the least recently used
+    # entries until we fit in 'max_bytes'.
+    def _evict(self, version):
+        total = 0
+        current = []
+        for entry in self._entries():
+            if entry[3] != version:
+                self._remove(entry[2])
+            else:
+                current.append(entry)
+                total += entry[1]
+        current.sort()
+        for (mtime, size, path, _) in current:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def __len__(self):
+        return len(self._entries())
+
+    def clear(self):
+        for entry in self._entries():
+            self._remove(entry[2])
+
+    # Summarize how well the cache is working.
+    def stats(self):
+        entries = self._entries()
+        return {'size': len(entries),
+                'bytes': sum(size for (_, size, _, _) in entries),
+                'max_bytes': self.max_bytes,
+                'hits': self.hits, 'misses': self.misses}
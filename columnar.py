@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+# A column-oriented copy of our main tables, stored as NumPy arrays which
+# can be memory-mapped.  This lets us run vectorized aggregations over
+# every row without turning each one into Python objects, and several
+# processes which open the same store share the same pages.
+#
+# Build the store after running 'make' with:
+#
+#     python columnar.py
+#
+# and then use it like this:
+#
+#     >>> lexique = ColumnStore().table('lexique')
+#     >>> cgram = lexique.strings('cgram')
+#     >>> np.bincount(cgram.codes, weights=lexique['freqfilms2'])
+#
+# Numeric columns are stored as float64 (with NaN for NULL) or int64.  Text
+# columns are dictionary-encoded: a sorted array of distinct values, plus
+# an int32 array of indexes into it, with -1 for NULL.
+
+from __future__ import print_function
+import os
+import sys
+import json
+import time
+
+import numpy as np
+import sqlite3
+
+# Where we keep our arrays, relative to the top-level directory.
+DIRECTORY = 'columns'
+
+# The tables we export.
+TABLES = ['lexique', 'lemme', 'verbe']
+
+# Figure out how to store a column, based on the types of its values.
+def _column_kind(conn, table, column):
+    types = set(row[0] for row in conn.execute(
+        'SELECT DISTINCT typeof("%s") FROM %s' % (column, table)))
+    if types <= set(['integer']):
+        return 'int'
+    if types <= set(['integer', 'real', 'null']):
+        return 'float'
+    return 'string'
+
+# Write a single column to '<directory>/<column>...'.
+def _export_column(conn, table, column, kind, directory):
+    values = (row[0] for row in conn.execute(
+        'SELECT "%s" FROM %s ORDER BY rowid' % (column, table)))
+    path = os.path.join(directory, column)
+    if kind == 'int':
+        np.save(path + '.npy', np.fromiter(values, dtype=np.int64))
+    elif kind == 'float':
+        np.save(path + '.npy', np.fromiter(
+            (np.nan if v is None else v for v in values), dtype=np.float64))
+    else:
+        values = list(values)
+        dictionary = sorted(set(v for v in values if v is not None))
+        index = dict((v, i) for (i, v) in enumerate(dictionary))
+        codes = np.fromiter((index.get(v, -1) if v is not None else -1
+                             for v in values), dtype=np.int32)
+        np.save(path + '.codes.npy', codes)
+        np.save(path + '.dict.npy', np.array(dictionary, dtype=np.unicode_))
+
+# Export each table in 'tables' to a subdirectory of 'directory'.
+def export(conn, directory=DIRECTORY, tables=TABLES):
+    for table in tables:
+        table_dir = os.path.join(directory, table)
+        if not os.path.isdir(table_dir):
+            os.makedirs(table_dir)
+        columns = [row[1] for row in
+                   conn.execute('PRAGMA table_info(%s)' % table)]
+        kinds = {}
+        for column in columns:
+            kinds[column] = _column_kind(conn, table, column)
+            _export_column(conn, table, column, kinds[column], table_dir)
+        rows = conn.execute('SELECT COUNT(*) FROM %s' % table).fetchone()[0]
+        # We write the manifest last, so a half-finished export won't load.
+        manifest = {'rows': rows, 'columns': columns, 'kinds': kinds}
+        with open(os.path.join(table_dir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+# A dictionary-encoded text column.
+class StringColumn(object):
+    def __init__(self, codes, dictionary):
+        self.codes = codes
+        self.dictionary = dictionary
+
+    # The code for a value, or -1 if it never appears.
+    def code(self, value):
+        i = np.searchsorted(self.dictionary, value)
+        if i < len(self.dictionary) and self.dictionary[i] == value:
+            return int(i)
+        return -1
+
+    # A boolean mask of the rows equal to 'value'.
+    def equals(self, value):
+        return self.codes == self.code(value)
+
+    # Decode the column (or the rows selected by 'index') into an array of
+    # Python strings, with None for NULL.
+    def decode(self, index=slice(None)):
+        codes = self.codes[index]
+        values = self.dictionary[np.maximum(codes, 0)].astype(object)
+        values[codes < 0] = None
+        return values
+
+    def __len__(self):
+        return len(self.codes)
+
+# One exported table.  Columns are opened on demand, and are read-only.
+class ColumnTable(object):
+    def __init__(self, directory, mmap_mode='r'):
+        self.directory = directory
+        self.mmap_mode = mmap_mode
+        with open(os.path.join(directory, 'manifest.json')) as f:
+            manifest = json.load(f)
+        self.rows = manifest['rows']
+        self.columns = manifest['columns']
+        self.kinds = manifest['kinds']
+        self._cache = {}
+
+    def _load(self, name):
+        return np.load(os.path.join(self.directory, name),
+                       mmap_mode=self.mmap_mode)
+
+    # Return a numeric column as an array, or a text column as a
+    # StringColumn.
+    def __getitem__(self, column):
+        if column not in self._cache:
+            if column not in self.kinds:
+                raise KeyError(column)
+            if self.kinds[column] == 'string':
+                self._cache[column] = StringColumn(
+                    self._load(column + '.codes.npy'),
+                    self._load(column + '.dict.npy'))
+            else:
+                self._cache[column] = self._load(column + '.npy')
+        return self._cache[column]
+
+    # Like self[column], but insist on a text column.
+    def strings(self, column):
+        if self.kinds.get(column) != 'string':
+            raise ValueError("Not a text column: %s" % column)
+        return self[column]
+
+    def __len__(self):
+        return self.rows
+
+# All of our exported tables.
+class ColumnStore(object):
+    def __init__(self, directory=DIRECTORY, mmap_mode='r'):
+        self.directory = directory
+        self.mmap_mode = mmap_mode
+        self._tables = {}
+
+    def table(self, name):
+        if name not in self._tables:
+            self._tables[name] = ColumnTable(
+                os.path.join(self.directory, name), self.mmap_mode)
+        return self._tables[name]
+
+if __name__ == '__main__':
+    print("Exporting columns to %s/..." % DIRECTORY, file=sys.stderr)
+    start = time.time()
+    export(sqlite3.connect("lexique.sqlite3"))
+    print("Exported %s in %.2fs" % (', '.join(TABLES), time.time() - start),
+          file=sys.stderr)
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+# Precompute frequency ranks and cumulative text coverage for each lemma,
+# for both corpora, overall and within each part of speech.  The results
+# go in the 'couverture' table:
+#
+#   corpus   'films' or 'livres'
+#   cgram    NULL for all words, or a part of speech like 'NOM' or 'VER'
+#   rang     1 for the most frequent lemma, 2 for the next, etc.
+#   lemme    the lemma at this rank
+#   freq     its frequency in this corpus
+#   couverture
+#            the percentage of the corpus covered by the lemmas with rank
+#            <= rang, within the same cgram
+#
+# See coverage_curves.py for a fast way to query this.
+
+from __future__ import print_function
+import sys
+import time
+
+import sqlite3
+
+# Our corpora, and the frequency column for each.
+CORPORA = [('films', 'freqfilms2'), ('livres', 'freqlivres')]
+
+# Lemmas grouped by simplified part of speech, the same way our notebook
+# groups them: 'AUX' counts as 'VER', and subcategories like 'PRO:per' are
+# lumped into 'PRO'.
+CGRAM_QUERY = """
+SELECT cgram, lemme, SUM(%(freq)s) AS freq
+  FROM (SELECT CASE WHEN cgram='AUX' THEN 'VER'
+                    ELSE SUBSTR(cgram, 1, 3)
+                    END AS cgram,
+               lemme, %(freq)s
+          FROM lemme)
+  GROUP BY cgram, lemme
+  ORDER BY cgram, freq DESC, lemme"""
+
+# All lemmas, regardless of part of speech.
+OVERALL_QUERY = """
+SELECT NULL AS cgram, lemme, %(freq)s AS freq FROM lemme_simple
+  ORDER BY freq DESC, lemme"""
+
+# Given (cgram, lemme, freq) rows sorted by cgram and then by descending
+# frequency, generate rows for our 'couverture' table.
+def coverage_rows(corpus, rows):
+    group = []
+    def flush():
+        total = sum(freq or 0.0 for (_, _, freq) in group) or 1.0
+        running = 0.0
+        for (rank, (cgram, lemme, freq)) in enumerate(group):
+            running += freq or 0.0
+            yield (corpus, cgram, rank + 1, lemme, freq,
+                   100.0 * running / total)
+    for row in rows:
+        if group and row[0] != group[0][0]:
+            for result in flush():
+                yield result
+            group = []
+        group.append(row)
+    for result in flush():
+        yield result
+
+def compute(conn):
+    conn.execute('DROP TABLE IF EXISTS couverture')
+    conn.execute("""CREATE TABLE couverture (
+                      corpus TEXT,
+                      cgram TEXT,
+                      rang INTEGER,
+                      lemme TEXT,
+                      freq REAL,
+                      couverture REAL)""")
+    count = 0
+    for (corpus, freq) in CORPORA:
+        for query in [OVERALL_QUERY, CGRAM_QUERY]:
+            rows = conn.execute(query % {'freq': freq}).fetchall()
+            conn.executemany('INSERT INTO couverture VALUES (?, ?, ?, ?, ?, ?)',
+                             coverage_rows(corpus, rows))
+            count += len(rows)
+    conn.execute('CREATE INDEX couverture_corpus_cgram_rang '
+                 'ON couverture (corpus, cgram, rang)')
+    conn.commit()
+    return count
+
+if __name__ == '__main__':
+    print("Computing text coverage...", file=sys.stderr)
+    start = time.time()
+    count = compute(sqlite3.connect("lexique.sqlite3"))
+    print("Stored %d coverage rows in %.2fs" % (count, time.time() - start),
+          file=sys.stderr)
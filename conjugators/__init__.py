@@ -5,7 +5,10 @@
 #   http://www.french-linguistics.co.uk/grammar/irregular_verbs_paradigms.shtml
 
 # Get our registry.
-from conjugator import BY_LABEL, ALL
+from conjugator import BY_LABEL, ALL, TENSES, PERSONS, UnimplementedConjugator
+from conjugator import Conjugator, Paradigm, choose_example_verbs
+import prototype
+import profiling
 
 # Load each group of conjugators.
 import irregular_conjugators
@@ -13,15 +16,31 @@ import er_conjugators
 import ir_conjugators
 import re_conjugators
 
-# Register the verbs in our database with the appropriate conjugator.
-def register_verbs_from_database(conn):
-    # We sort by frequency because the first verb registered will become
-    # the example verb.
+# Conjugation straight from the prototype templates, for verbs without a
+# working conjugator.
+import templates
+
+# Bulk conjugation, which needs all of the above.
+from bulk import conjugate_many
+
+# Record every call to a conjugator or template method, if we're profiling.
+profiling.instrument_class(Conjugator)
+profiling.instrument_class(templates.Template)
+
+# Pick example verbs for our conjugators from the verbs in our database.
+def choose_example_verbs_from_database(conn):
     query = """
-    SELECT prototype, lemme FROM verbe
-    WHERE prototype IS NOT NULL
-    ORDER BY freqfilms2 DESC"""
-    for row in conn.execute(query):
-        label, lemme = row
-        conj = BY_LABEL[label]
-        conj.register_verb(lemme)
+    SELECT prototype, lemme, freqfilms2 FROM verbe
+    WHERE prototype IS NOT NULL"""
+    return choose_example_verbs(conn.execute(query))
+
+# Generate every form of 'infinitive', whose prototype has the label
+# 'label', as a Paradigm.  We use the conjugator for 'label' if it's
+# implemented, and otherwise fall back to the prototype's templates.
+# Returns None if neither can conjugate the verb.
+def conjugate(label, infinitive):
+    conj = BY_LABEL[label]
+    if conj.IMPLEMENTED:
+        return conj.paradigm(infinitive)
+    return templates.for_prototype(prototype.BY_LABEL[label]).paradigm(
+        infinitive)
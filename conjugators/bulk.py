@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+# Conjugate large numbers of verbs at once, optionally spreading the work
+# across several processes.
+
+from itertools import islice
+import multiprocessing
+
+import prototype
+from conjugator import BY_LABEL
+import templates
+
+# Conjugate a batch of verbs which all share a prototype label.  This runs
+# inside worker processes, so it needs to be a top-level function, and it
+# takes a label instead of a conjugator so that the arguments pickle
+# cleanly.
+def _conjugate_batch(task):
+    (label, infinitives) = task
+    if label is None:
+        return [(infinitive, None) for infinitive in infinitives]
+    conj = BY_LABEL[label]
+    if conj.IMPLEMENTED:
+        return [(infinitive, conj.paradigm(infinitive))
+                for infinitive in infinitives]
+    template = templates.for_prototype(prototype.BY_LABEL[label])
+    return [(infinitive, template.paradigm(infinitive))
+            for infinitive in infinitives]
+
+# Split a chunk of infinitives into batches of at most 'batch_size' verbs
+# with the same conjugator.  Batches come out in the order their labels
+# first appear in the chunk, and verbs keep their order within a batch.
+def _batches(infinitives, batch_size):
+    order = []
+    groups = {}
+    for infinitive in infinitives:
+        p = prototype.match(infinitive)
+        label = p.label if p is not None else None
+        if label not in groups:
+            order.append(label)
+            groups[label] = []
+        groups[label].append(infinitive)
+    for label in order:
+        group = groups[label]
+        for i in range(0, len(group), batch_size):
+            yield (label, group[i:i+batch_size])
+
+# Read 'infinitives' a chunk at a time, and split each chunk into batches.
+def _tasks(infinitives, chunk_size, batch_size):
+    infinitives = iter(infinitives)
+    while True:
+        chunk = list(islice(infinitives, chunk_size))
+        if not chunk:
+            break
+        for task in _batches(chunk, batch_size):
+            yield task
+
+# Conjugate every infinitive in an iterable, yielding (infinitive,
+# paradigm) pairs, where 'paradigm' is the result of Conjugator.paradigm,
+# or of the prototype's templates if its conjugator isn't implemented, or
+# None if we don't know how to conjugate the verb.
+#
+# We read the input 'chunk_size' verbs at a time and group each chunk by
+# conjugator, so the output comes out grouped that way, too.  If
+# 'processes' is anything other than 1, we farm the batches out to a
+# multiprocessing.Pool with that many workers (None means one per core).
+# The results are the same, in the same order, either way.
+def conjugate_many(infinitives, processes=1, chunk_size=10000,
+                   batch_size=250):
+    tasks = _tasks(infinitives, chunk_size, batch_size)
+    if processes == 1:
+        results = (_conjugate_batch(task) for task in tasks)
+        for batch in results:
+            for result in batch:
+                yield result
+        return
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        for batch in pool.imap(_conjugate_batch, tasks):
+            for result in batch:
+                yield result
+    finally:
+        pool.terminate()
+        pool.join()
@@ -6,11 +6,14 @@ from collections import defaultdict
 from unicodedata import normalize
 import re
 
+# Our tenses and persons, and the compact objects we store them in.
+from paradigm import PERSONS, TENSES, Paradigm
+
 # A decorator which allows only one instance of each subclass to be
 # created.  We do things like this because we're deliberately confusing
 # classes and intances, which allows us to store quite a few variables like
-# PAST_PARTICIPLE on the class, but still easy override methods and update
-# variables like example_verb at runtime.
+# PAST_PARTICIPLE on the class, but still easy override methods.  Once
+# created, an instance never changes, so it can be shared between threads.
 #
 # This is a bit of a weird design, but it just fell out.  And hey, I need
 # to find out how metaprogramming works in Python, anyway.
@@ -30,6 +33,9 @@ def per_subclass_singleton(klass):
 # Conjugate a group of verbs.
 @per_subclass_singleton
 class Conjugator(object):
+    # Set to False by subclasses which can't actually generate forms.
+    IMPLEMENTED = True
+
     REMOVE = None
     PAST_PARTICIPLE = None
     SINGULAR_RADICAL = None
@@ -53,22 +59,63 @@ class Conjugator(object):
     SUBJUNCTIVE_IMPERFECT_SUFFIXES = \
       ['sse', 'sses', u'\u0302t', 'ssions', 'ssiez', 'ssent']
 
-    # Initialize this conjugator.
+    # Keys which hold '|'-separated radicals, each of which needs a REMOVE
+    # pattern defined at the same level of the class hierarchy.
+    RADICAL_KEYS = ['PAST_PARTICIPLE', 'SINGULAR_RADICAL', 'ATONIC_RADICAL',
+                    'TONIC_RADICAL', 'FUTURE_RADICAL', 'SIMPLE_PAST_RADICAL']
+
+    # Keys which hold lists of suffixes.
+    SUFFIX_KEYS = ['PRESENT_SUFFIXES', 'IMPERATIVE_SUFFIXES',
+                   'SIMPLE_PAST_SUFFIXES', 'SUBJUNCTIVE_IMPERFECT_SUFFIXES']
+
+    # Initialize this conjugator.  Python calls this every time somebody
+    # calls our constructor, even though per_subclass_singleton always
+    # returns the same instance, so we only compile our rules once.
     def __init__(self):
-        self.example_verb = None
+        if '_rules' not in self.__dict__:
+            self._compile_rules()
+
+    # Resolve all our radicals and suffixes once, so that we don't need to
+    # search the class hierarchy or build regexes every time we conjugate
+    # a verb.  Keys which can't be resolved map to None, and raise a
+    # KeyError when used, just like _find_key.
+    def _compile_rules(self):
+        rules = {}
+        for key in self.RADICAL_KEYS:
+            try:
+                (radicals, remove) = self._find_key(key, 'REMOVE')
+            except KeyError:
+                rules[key] = None
+                continue
+            # Only radicals which refer to groups need the regex machinery.
+            alternatives = tuple((r, '\\' in r) for r in radicals.split('|'))
+            rules[key] = (re.compile(remove + u'$'), alternatives)
+        for key in self.SUFFIX_KEYS:
+            try:
+                rules[key] = tuple(self._find_key(key))
+            except KeyError:
+                rules[key] = None
+        self._rules = rules
+
+    # Look up a compiled rule.
+    def _rule(self, key):
+        rule = self._rules[key]
+        if rule is None:
+            raise KeyError(key)
+        return rule
 
-    # Let the conjugator know about a verb.
-    def register_verb(self, infinitive):
-        if self.example_verb is None:
-            self.example_verb = infinitive
+    # The verb we use as an example of this conjugator, as picked by
+    # choose_example_verbs, or None.
+    @property
+    def example_verb(self):
+        return _example_verbs.get(self.__class__)
 
     # Return a reasonable name for this conjugator.
     @classmethod
     def name(klass):
         if 'NAME' in klass.__dict__:
             return klass.NAME
-        elif klass.instance() and klass.instance().example_verb:
-            return klass.instance().example_verb
+        return _example_verbs.get(klass)
 
     # Search up the class hierarchy for the specified key.  If it is found,
     # optionally return a related key from the same level of the class
@@ -90,8 +137,13 @@ class Conjugator(object):
     # Returns a list because of verbs which have alternative versions of
     # certain radicals.
     def _radicals(self, key, infinitive):
-        (radicals, remove) = self._find_key(key, 'REMOVE')
-        return [re.sub(remove+u'$', r, infinitive) for r in radicals.split('|')]
+        (remove, alternatives) = self._rule(key)
+        match = remove.search(infinitive)
+        if match is None:
+            return [infinitive for r in alternatives]
+        head = infinitive[:match.start()]
+        return [head + (match.expand(r) if has_groups else r)
+                for (r, has_groups) in alternatives]
 
     def past_participles(self, infinitive):
         return self._radicals('PAST_PARTICIPLE', infinitive)
@@ -116,27 +168,28 @@ class Conjugator(object):
         return self._radicals('SIMPLE_PAST_RADICAL', infinitive)
 
     def present_suffixes(self):
-        return self._find_key('PRESENT_SUFFIXES')
+        return self._rule('PRESENT_SUFFIXES')
 
     def imperative_suffixes(self):
-        return self._find_key('IMPERATIVE_SUFFIXES')
+        return self._rule('IMPERATIVE_SUFFIXES')
 
     def simple_past_suffixes(self):
-        return self._find_key('SIMPLE_PAST_SUFFIXES')
+        return self._rule('SIMPLE_PAST_SUFFIXES')
 
     def subjunctive_imperfect_suffixes(self):
-        return self._find_key('SUBJUNCTIVE_IMPERFECT_SUFFIXES')
+        return self._rule('SUBJUNCTIVE_IMPERFECT_SUFFIXES')
 
     # General suffix application rules that simplify life elsewhere.
     def _apply_suffix(self, radical, suffix):
-        soft_vowels = u'^[ieéè]'
-        if re.search('g$', radical) and not re.search(soft_vowels, suffix):
+        last = radical[-1:]
+        soft = suffix[:1] in (u'i', u'e', u'é', u'è')
+        if last == u'g' and not soft:
             # Preserve soft 'g' sounds.
             radical = radical + u'e'
-        elif re.search('c$', radical) and not re.search(soft_vowels, suffix):
+        elif last == u'c' and not soft:
             # Preserve soft 'c' sounds.
-            radical = re.sub('c$', u'ç', radical)
-        elif re.search('[dt]$', radical) and suffix == u't':
+            radical = radical[:-1] + u'ç'
+        elif last in (u'd', u't') and suffix == u't':
             # Assimilate trailing 't' suffixes.
             suffix = u''
         # Normalize Unicode to support simple_past_radicals which begin
@@ -208,6 +261,20 @@ class Conjugator(object):
         suffixes = self.subjunctive_imperfect_suffixes()
         return self._simple_forms(past_r, suffixes)
 
+    # Generate every tense of a verb, as a Paradigm.  Indexing it by the
+    # names in TENSES returns the lists returned by the corresponding
+    # methods.
+    def paradigm(self, infinitive):
+        return Paradigm(infinitive,
+                        dict((tense, getattr(self, tense)(infinitive))
+                             for (tense, persons) in TENSES))
+
+    # Generate every form of a verb, as (tense, person, form) tuples.  The
+    # person is None for participles.  Forms with several alternatives
+    # produce one tuple per alternative.
+    def all_forms(self, infinitive):
+        return self.paradigm(infinitive).forms()
+
     # Attach a subject pronoun to a verb form.
     def _prepend_pronoun(self, pronoun, form):
         nf = normalize('NFD', form)
@@ -324,12 +391,23 @@ class Conjugator(object):
         self._assert_matches(prototype, 'simple_past')
         self._assert_matches(prototype, 'subjunctive_imperfect')
 
+    # Compare every tense with the specified Prototype object, without
+    # stopping at the first problem.  Returns a list of (method_name,
+    # expected, got) tuples, one for each tense which doesn't match.
+    def prototype_mismatches(self, prototype):
+        mismatches = []
+        for (method_name, persons) in TENSES:
+            expected = getattr(prototype, 'example_' + method_name)()
+            got = getattr(self, method_name)(prototype.infinitive)
+            if expected != got:
+                mismatches.append((method_name, expected, got))
+        return mismatches
+
 # Used by default for verb forms we don't handle yet.  Because of the
 # per_subclass_singleton code, there's only one instance of this class
 # shared between all unknown verbs.
 class UnimplementedConjugator(Conjugator):
-    def register_verb(self, infinitive):
-        None
+    IMPLEMENTED = False
 
     def assert_matches_prototype(self, prototype):
         print("Unimplemented: %s (%s)" % (self.name(), prototype.label))
@@ -338,6 +416,33 @@ class UnimplementedConjugator(Conjugator):
 # A list of all known conjugators.
 ALL = []
 
+# The example verb of each conjugator class.  This is metadata about our
+# registry, not part of the conjugators, and only choose_example_verbs
+# changes it, by replacing the whole dictionary at once.  So other threads
+# see either the old examples or the new ones, never a mixture.
+_example_verbs = {}
+
+# Pick an example verb for each conjugator.  'verbs' is an iterable of
+# (prototype label, infinitive, frequency) tuples, in any order.  We pick
+# the most frequent verb, breaking ties by infinitive, so the result only
+# depends on the verbs.  UnimplementedConjugator is shared by many
+# unrelated verbs, so it doesn't get an example.  Returns a dictionary
+# mapping conjugator classes to their example verbs.
+def choose_example_verbs(verbs):
+    global _example_verbs
+    best = {}
+    for (label, infinitive, frequency) in verbs:
+        klass = BY_LABEL[label].__class__
+        if klass is UnimplementedConjugator:
+            continue
+        key = (-(frequency or 0.0), infinitive)
+        if klass not in best or key < best[klass]:
+            best[klass] = key
+    examples = dict((klass, infinitive)
+                    for (klass, (_, infinitive)) in best.items())
+    _example_verbs = examples
+    return examples
+
 # Look up conjugators by verb label.
 BY_LABEL = defaultdict(UnimplementedConjugator)
 
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+# A compact representation of every form of a verb.
+#
+# Our tense methods return a list of persons, each of which is a list of
+# alternative forms, and Conjugator.paradigm used to return a dictionary
+# of ten of those.  That adds up when we conjugate thousands of verbs: a
+# dictionary, eleven lists and a string for every form of every verb, even
+# though many forms repeat (je parlais, tu parlais).  A Paradigm instead
+# stores one flat tuple with an entry for each (tense, person) slot in
+# LAYOUT, which all paradigms share.  Each entry is either a single form,
+# or, for the few slots with alternatives, a tuple of forms.  Repeated
+# forms and entries within a verb are stored only once.
+#
+#     >>> paradigm = conj.paradigm(u'parler')
+#     >>> paradigm['present']
+#     [[u'parle'], [u'parles'], [u'parle'], [u'parlons'], [u'parlez'], ...]
+#
+# Indexing a Paradigm by tense gives back the same lists the tense method
+# returned, so code written for the old dictionaries keeps working.
+
+# The persons used by most tenses, using the same notation as the 'infover'
+# column in Lexique.
+PERSONS = ['1s', '2s', '3s', '1p', '2p', '3p']
+
+# Every tense we know how to generate, and the persons it uses.  The
+# participles have no person, and return a single list of alternatives.
+TENSES = [
+    ('past_participles', None),
+    ('present_particples', None),
+    ('present', PERSONS),
+    ('imperative', ['2s', '1p', '2p']),
+    ('imperfect', PERSONS),
+    ('subjunctive', PERSONS),
+    ('future', PERSONS),
+    ('conditional', PERSONS),
+    ('simple_past', PERSONS),
+    ('subjunctive_imperfect', PERSONS),
+]
+
+# Every (tense, person) slot in a Paradigm, in order.  Participles have
+# one slot, with a person of None.
+LAYOUT = tuple((tense, person)
+               for (tense, persons) in TENSES
+               for person in (persons or [None]))
+
+# Map each tense to (start, stop, has_persons), describing its slots.
+_SLICES = {}
+_start = 0
+for (tense, persons) in TENSES:
+    _count = len(persons) if persons is not None else 1
+    _SLICES[tense] = (_start, _start + _count, persons is not None)
+    _start += _count
+del _start, _count
+
+# Turn an entry in a Paradigm back into a list of alternatives.
+def _alternatives(entry):
+    if isinstance(entry, tuple):
+        return list(entry)
+    return [entry]
+
+class Paradigm(object):
+    __slots__ = ('infinitive', '_slots')
+
+    # 'tenses' maps each tense in TENSES to what its tense method returns.
+    def __init__(self, infinitive, tenses):
+        self.infinitive = infinitive
+        forms = {}
+        entries = {}
+        slots = []
+        for (tense, persons) in TENSES:
+            values = tenses[tense]
+            if persons is None:
+                values = [values]
+            elif len(values) != len(persons):
+                raise ValueError("Expected %d persons for %s of %s, got %d" %
+                                 (len(persons), tense, infinitive,
+                                  len(values)))
+            for alternatives in values:
+                if len(alternatives) == 1:
+                    slots.append(forms.setdefault(alternatives[0],
+                                                  alternatives[0]))
+                else:
+                    entry = tuple(forms.setdefault(f, f) for f in alternatives)
+                    slots.append(entries.setdefault(entry, entry))
+        self._slots = tuple(slots)
+
+    # The forms of 'tense', in the same shape as the tense method returns.
+    def __getitem__(self, tense):
+        (start, stop, has_persons) = _SLICES[tense]
+        if not has_persons:
+            return _alternatives(self._slots[start])
+        return [_alternatives(entry) for entry in self._slots[start:stop]]
+
+    def keys(self):
+        return [tense for (tense, persons) in TENSES]
+
+    # Return the old dictionary of lists of lists.
+    def as_dict(self):
+        return dict((tense, self[tense]) for tense in self.keys())
+
+    # Generate every form, as (tense, person, form) tuples.  The person is
+    # None for participles, and forms with several alternatives produce
+    # one tuple per alternative.
+    def forms(self):
+        for ((tense, person), entry) in zip(LAYOUT, self._slots):
+            if isinstance(entry, tuple):
+                for form in entry:
+                    yield (tense, person, form)
+            else:
+                yield (tense, person, entry)
+
+    def __eq__(self, other):
+        return isinstance(other, Paradigm) and self._slots == other._slots
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._slots)
+
+    def __repr__(self):
+        return '<Paradigm %s>' % self.infinitive.encode('utf-8')
+
+    # Classes with __slots__ need these to be pickled, which we do when
+    # conjugating in worker processes.
+    def __getstate__(self):
+        return (self.infinitive, self._slots)
+
+    def __setstate__(self, state):
+        (self.infinitive, self._slots) = state
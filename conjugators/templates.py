@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+# Conjugate verbs directly from the templates in verbs-0-2-0.xml, for
+# prototypes whose conjugator isn't implemented yet.
+#
+# Each <Prototype> gives an example INFINITIVE, split into a RADICAL and an
+# ENDING, and a list of endings for every tense.  To conjugate another verb
+# with the same prototype, we strip the ENDING from the verb and add each
+# tense's endings to what's left.  Prototypes like .*e([lt])er capture one
+# letter of the ending, which the templates refer to as '?':
+#
+#     jeter:    RADICAL="j" ENDING="eter" PRÉSENT="e??e,e??es,..."
+#     appeler:  strip "e?er" with ? = l, giving "app" + "elle", ...
+#
+# We compile each prototype the first time we need it, so conjugating a
+# verb is just string concatenation.  An empty template means the form
+# doesn't exist (il pleut, but not *je pleus), so we leave it out.
+
+from paradigm import TENSES, Paradigm
+
+# Map each of our tenses to the Prototype attribute holding its templates,
+# and for tenses with persons, the indices of the persons we use.  The
+# participles list every gender and number, but we only generate the
+# masculine singular, just like our conjugators.
+_ATTRIBUTES = {
+    'past_participles': ('ppasse', None),
+    'present_particples': ('ppresent', None),
+    'present': ('present', range(6)),
+    'imperative': ('imperatif', [1, 3, 4]),
+    'imperfect': ('imparfait', range(6)),
+    'subjunctive': ('spresent', range(6)),
+    'future': ('futur', range(6)),
+    'conditional': ('condition', range(6)),
+    'simple_past': ('passe', range(6)),
+    'subjunctive_imperfect': ('simparfait', range(6)),
+}
+
+# Parse a comma-separated list of templates, each of which has
+# '|'-separated alternatives, into a list of tuples of (ending, has_c)
+# pairs.  'count' is the number of entries we expect.
+def _parse_templates(text, count):
+    if not text:
+        return [()] * count
+    entries = text.split(',')
+    if len(entries) < count:
+        entries.extend([u''] * (count - len(entries)))
+    return [tuple((a, '?' in a) for a in entry.split('|') if a)
+            for entry in entries]
+
+class Template(object):
+    def __init__(self, prototype):
+        self.label = prototype.label
+        self.infinitive = prototype.infinitive
+
+        # Find the letter captured by our prototype's regex, if any, and
+        # replace it with '?' in our ending, like the other templates.
+        ending = prototype.ending
+        match = prototype.regex.search(prototype.infinitive)
+        if 'c' in match.groupdict() and match.group('c') is not None:
+            i = match.start('c') - len(prototype.radical)
+            if i < 0:
+                raise ValueError("Captured letter outside ending of %s" %
+                                 prototype.infinitive)
+            ending = ending[:i] + u'?' + ending[i+1:]
+        (self._head, _, self._tail) = ending.partition(u'?')
+        self._has_c = u'?' in ending
+
+        self._tenses = []
+        for (tense, persons) in TENSES:
+            (attr, indices) = _ATTRIBUTES[tense]
+            if indices is None:
+                entries = _parse_templates(getattr(prototype, attr), 1)[:1]
+            else:
+                entries = _parse_templates(getattr(prototype, attr), 6)
+                entries = [entries[i] for i in indices]
+            self._tenses.append((tense, persons is None, entries))
+
+    # Split 'infinitive' into the part we keep and the letter captured by
+    # '?', or return None if it doesn't end with our ending.
+    def _split(self, infinitive):
+        if not self._has_c:
+            if not infinitive.endswith(self._head):
+                return None
+            return (infinitive[:len(infinitive) - len(self._head)], None)
+        length = len(self._head) + 1 + len(self._tail)
+        if len(infinitive) < length or not infinitive.endswith(self._tail):
+            return None
+        start = len(infinitive) - length
+        if infinitive[start:start+len(self._head)] != self._head:
+            return None
+        return (infinitive[:start], infinitive[start+len(self._head)])
+
+    # Generate every tense of 'infinitive' as a Paradigm, or return None if
+    # it doesn't have our ending.
+    def paradigm(self, infinitive):
+        split = self._split(infinitive)
+        if split is None:
+            return None
+        (stem, c) = split
+        tenses = {}
+        for (tense, is_participle, entries) in self._tenses:
+            forms = [[stem + (a.replace(u'?', c) if has_c else a)
+                      for (a, has_c) in entry]
+                     for entry in entries]
+            tenses[tense] = forms[0] if is_participle else forms
+        return Paradigm(infinitive, tenses)
+
+# Compiled templates, by prototype label.  Templates never change once
+# they're compiled, so if two threads compile the same prototype at once,
+# it doesn't matter which one we keep.
+_TEMPLATES = {}
+
+# Return the compiled Template for a Prototype.
+def for_prototype(prototype):
+    template = _TEMPLATES.get(prototype.label)
+    if template is None:
+        template = _TEMPLATES[prototype.label] = Template(prototype)
+    return template
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+# Answer questions like "how many nouns do I need to know to understand 90%
+# of the nouns in films?" using the 'couverture' table built by
+# compute_coverage.py:
+#
+#     >>> words_for_coverage(90, cgram='NOM', corpus='films')
+#
+# We load each (corpus, cgram) curve into an array the first time we need
+# it, and then use binary search.
+
+from array import array
+from bisect import bisect_left
+
+import lexique_db
+
+# Maps (corpus, cgram) to an array of cumulative coverage percentages, in
+# order of rank.
+_curves = {}
+
+# Return the coverage curve for a corpus and part of speech.  'cgram' may
+# be None for all words.
+def curve(corpus='films', cgram=None):
+    key = (corpus, cgram)
+    if key not in _curves:
+        rows = lexique_db.rows(
+            """SELECT couverture FROM couverture
+                 WHERE corpus = ? AND cgram IS ? ORDER BY rang""",
+            (corpus, cgram))
+        if not rows:
+            raise KeyError(key)
+        _curves[key] = array('d', (row[0] for row in rows))
+    return _curves[key]
+
+# Our coverage percentages are running sums of floats, so the last one may
+# come out as 99.99999999999997 instead of 100.  We treat percentages this
+# close together as equal.
+_TOLERANCE = 1e-9
+
+# The smallest number of words which cover at least 'percent' of the
+# corpus, or None if no number of words does.
+def words_for_coverage(percent, cgram=None, corpus='films'):
+    values = curve(corpus, cgram)
+    i = bisect_left(values, percent - _TOLERANCE)
+    if i == len(values):
+        return None
+    return i + 1
+
+# The percentage of the corpus covered by the 'count' most frequent words.
+def coverage_for_words(count, cgram=None, corpus='films'):
+    values = curve(corpus, cgram)
+    if count <= 0:
+        return 0.0
+    return values[min(count, len(values)) - 1]
+
+# Build a table of how many words we need for each threshold and cgram,
+# as a dictionary mapping cgram to a list of word counts, one per threshold.
+def threshold_table(thresholds=[75, 90, 95, 98, 99, 99.5], cgrams=[None],
+                    corpus='films'):
+    return dict((cgram, [words_for_coverage(t, cgram, corpus)
+                         for t in thresholds])
+                for cgram in cgrams)
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+# Run createdb.sql against our database in a single transaction, timing
+# each statement, so that we can see which part of the build got slower:
+#
+#     python createdb.py lexique.sqlite3
+#
+# This replaces "sqlite3 lexique.sqlite3 < createdb.sql", which committed
+# after every statement and didn't tell us where the time went.
+
+from __future__ import print_function
+import sys
+import io
+import time
+import argparse
+
+import sqlite3
+
+# Split a SQL script into statements, dropping comments and blank lines.
+def statements(script):
+    current = []
+    for line in script.splitlines():
+        if not current and (not line.strip() or line.startswith('--')):
+            continue
+        current.append(line)
+        sql = '\n'.join(current)
+        if sqlite3.complete_statement(sql):
+            yield sql.strip()
+            current = []
+    if current:
+        raise ValueError("Incomplete SQL statement: %s" % '\n'.join(current))
+
+# A short name for a statement, for our timing report.
+def describe(sql):
+    return sql.splitlines()[0].rstrip(';').strip()
+
+# Run 'script' against 'conn' in one transaction.  PRAGMAs are run first,
+# outside the transaction, because some of them can't be changed inside
+# one.  Returns a list of (description, seconds) pairs.
+#
+# load_lexique.py turns off the rollback journal, and without one, SQLite
+# can't undo a failed transaction.  So we turn it back on while we run,
+# and restore the old setting afterwards.
+def run(conn, script):
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None
+    journal_mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+    if journal_mode.lower() == 'off':
+        conn.execute('PRAGMA journal_mode = DELETE')
+    sqls = list(statements(script))
+    timings = []
+    for sql in sqls:
+        if sql.upper().startswith('PRAGMA'):
+            conn.execute(sql)
+    conn.execute('BEGIN')
+    try:
+        for sql in sqls:
+            if sql.upper().startswith('PRAGMA'):
+                continue
+            start = time.time()
+            conn.execute(sql)
+            timings.append((describe(sql), time.time() - start))
+        start = time.time()
+        conn.execute('COMMIT')
+        timings.append(('COMMIT', time.time() - start))
+    except:
+        conn.execute('ROLLBACK')
+        raise
+    finally:
+        conn.execute('PRAGMA journal_mode = %s' % journal_mode)
+        conn.isolation_level = isolation_level
+    return timings
+
+# Print the timings returned by run().
+def print_timings(timings, out=sys.stderr):
+    total = sum(seconds for (_, seconds) in timings)
+    for (description, seconds) in timings:
+        share = 100.0 * seconds / max(total, 1e-6)
+        print("%7.3fs %5.1f%%  %s" % (seconds, share, description), file=out)
+    print("%7.3fs total" % total, file=out)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('database', nargs='?', default='lexique.sqlite3')
+    parser.add_argument('--script', default='createdb.sql')
+    args = parser.parse_args()
+
+    with io.open(args.script, encoding='utf-8') as f:
+        script = f.read()
+    conn = sqlite3.connect(args.database)
+    timings = run(conn, script)
+    conn.close()
+    print_timings(timings)
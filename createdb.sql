@@ -1,23 +1,16 @@
 -- Make sure our encoding is sane.
 PRAGMA encoding = "UTF-8";
 
--- Set up our original data table.  This is pretty raw.
-CREATE TABLE lexique (
-ortho TEXT,
-phon TEXT,
-lemme TEXT,
-cgram TEXT,
-genre TEXT,
-nombre TEXT,
-freqlemfilms2 REAL,
-freqlemlivres REAL,
-freqfilms2 REAL,
-freqlivres REAL);
-CREATE INDEX lexique_lemme ON lexique (lemme);
-
--- Import the raw data we generated above.
-.separator "\t"
-.import "lexique.txt" lexique
+-- Our original data table, 'lexique', is pretty raw.  It has already
+-- been created and filled in by load_lexique.py.
+--
+-- We build 'lemme' with one scan of 'lexique', and derive 'lemme_simple'
+-- and 'verbe' from 'lemme', which is much smaller.  Adding up the sums in
+-- 'lemme' adds the same frequencies in a different order than a scan of
+-- 'lexique' would, so the last bits of a few totals may differ, but
+-- nothing we report is that precise.  We create all our indexes at the
+-- end, once the tables are full.  createdb.py runs this whole file in one
+-- transaction and times each statement.
 
 -- Create a table containing just the lemmas, not the inflections.  Note
 -- that one word may appear multiple times with different parts of speech
@@ -45,10 +38,6 @@ CREATE TABLE lemme AS
          SUM(freqfilms2) AS freqfilms2, SUM(freqlivres) AS freqlivres
     FROM lexique
     GROUP BY lemme, cgram, genre, nombre;
-CREATE INDEX lemme_lemme ON lemme (lemme);
-CREATE INDEX lemme_freqfilms2 ON lemme (freqfilms2);
-CREATE INDEX lemme_freqlivres ON lemme (freqlivres);
-CREATE INDEX lemme_cgram ON lemme (cgram);
 
 -- Like 'lemme', except we ignore parts of speech, gender and number,
 -- and just lump everything together.  So 'avoir', etc., should only
@@ -69,11 +58,8 @@ CREATE INDEX lemme_cgram ON lemme (cgram);
 CREATE TABLE lemme_simple AS
   SELECT lemme,
          SUM(freqfilms2) AS freqfilms2, SUM(freqlivres) AS freqlivres
-    FROM lexique
+    FROM lemme
     GROUP BY lemme;
-CREATE UNIQUE INDEX lemme_simple_lemme ON lemme_simple (lemme);
-CREATE INDEX lemme_simple_freqfilms2 ON lemme_simple (freqfilms2);
-CREATE INDEX lemme_simple_freqlivres ON lemme_simple (freqlivres);
 
 CREATE TABLE conjugaison (
   nom TEXT,
@@ -81,6 +67,15 @@ CREATE TABLE conjugaison (
   resume TEXT
 );
 
+-- Every conjugated form of every verb we know how to conjugate.  This is
+-- filled in by materialize_forms.py, which also indexes it.
+CREATE TABLE forme (
+  lemme TEXT,
+  temps TEXT,
+  personne TEXT,
+  forme TEXT
+);
+
 CREATE TABLE verbe AS
   SELECT lemme,
          CASE
@@ -97,6 +92,16 @@ CREATE TABLE verbe AS
     FROM lemme
     WHERE cgram IN ('VER', 'AUX')
     GROUP BY lemme;
+
+-- Index everything.
+CREATE INDEX lexique_lemme ON lexique (lemme);
+CREATE INDEX lemme_lemme ON lemme (lemme);
+CREATE INDEX lemme_freqfilms2 ON lemme (freqfilms2);
+CREATE INDEX lemme_freqlivres ON lemme (freqlivres);
+CREATE INDEX lemme_cgram ON lemme (cgram);
+CREATE UNIQUE INDEX lemme_simple_lemme ON lemme_simple (lemme);
+CREATE INDEX lemme_simple_freqfilms2 ON lemme_simple (freqfilms2);
+CREATE INDEX lemme_simple_freqlivres ON lemme_simple (freqlivres);
 CREATE UNIQUE INDEX verbe_lemme ON verbe (lemme);
 CREATE INDEX verbe_groupe ON verbe (groupe);
 CREATE INDEX verbe_freqfilms2 ON verbe (freqfilms2);
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+# Map inflected verb forms back to their infinitives.  We build this by
+# conjugating each known verb once, with conjugators.conjugate, so lookups
+# are just a hash table access:
+#
+#     >>> lemmatizer = Lemmatizer.from_database(conn)
+#     >>> lemmatizer.analyze(u'achètent')
+#     [(u'acheter', 'present', '3p'), (u'acheter', 'subjunctive', '3p')]
+#
+# We also remember the endings each conjugator produces, which lets us make
+# educated guesses about verbs that aren't in our database.
+
+from __future__ import print_function
+from collections import defaultdict
+from unicodedata import normalize
+
+import prototype
+import conjugators
+
+# Normalize a token the same way our conjugators normalize their output.
+def _normalize(token):
+    return normalize('NFC', unicode(token)).lower()
+
+# Verbs whose labels share a conjugator conjugate alike, so we group our
+# guessing rules by conjugator.  Verbs without one are conjugated from
+# their own prototype's templates, so we group those by label.
+def _conjugation(label):
+    conj = conjugators.BY_LABEL[label]
+    return conj if conj.IMPLEMENTED else label
+
+# The length of the longest common prefix of two strings.
+def _common_prefix_length(a, b):
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+class Lemmatizer(object):
+    def __init__(self):
+        # Maps each known form to a list of (infinitive, tense, person).
+        self.analyses = defaultdict(list)
+        # Maps form endings to a set of (infinitive ending, conjugation,
+        # tense, person) rules, for guessing.  See _conjugation.
+        self.rules = defaultdict(set)
+        self.known = set()
+
+    # Add a verb whose prototype has the label 'label', and all its forms.
+    def add_verb(self, infinitive, label):
+        paradigm = conjugators.conjugate(label, infinitive)
+        if paradigm is None:
+            return
+        conjugation = _conjugation(label)
+        self.known.add(infinitive)
+        for (tense, person, form) in paradigm.forms():
+            analysis = (infinitive, tense, person)
+            if analysis not in self.analyses[form]:
+                self.analyses[form].append(analysis)
+            p = _common_prefix_length(infinitive, form)
+            self.rules[form[p:]].add(
+                (infinitive[p:], conjugation, tense, person))
+
+    # Build a lemmatizer for all the verbs in our database.
+    @classmethod
+    def from_database(klass, conn):
+        lemmatizer = klass()
+        query = 'SELECT lemme, prototype FROM verbe WHERE prototype IS NOT NULL'
+        for (lemme, label) in conn.execute(query):
+            lemmatizer.add_verb(lemme, label)
+        lemmatizer.analyses = dict(lemmatizer.analyses)
+        lemmatizer.rules = dict(lemmatizer.rules)
+        return lemmatizer
+
+    # Return a list of (infinitive, tense, person) tuples for 'form'.  If
+    # 'guess' is true and we don't know the form, try to find verbs outside
+    # our database which would produce it.
+    def analyze(self, form, guess=False):
+        form = _normalize(form)
+        found = self.analyses.get(form)
+        if found:
+            return list(found)
+        if guess:
+            return self._guess(form)
+        return []
+
+    # Analyze each token in an iterable, yielding (token, analyses) pairs.
+    # Tokens repeat a lot in real text, so we remember our answers.
+    def analyze_many(self, tokens, guess=False):
+        seen = {}
+        for token in tokens:
+            if token not in seen:
+                seen[token] = self.analyze(token, guess)
+            yield (token, seen[token])
+
+    # Apply our ending rules backwards, and keep any candidate infinitive
+    # which our prototypes conjugate the same way, and which really does
+    # conjugate to 'form'.
+    def _guess(self, form):
+        results = []
+        for i in range(len(form) + 1):
+            for (ending, conjugation, tense, person) in self.rules.get(
+                    form[i:], ()):
+                infinitive = form[:i] + ending
+                if infinitive in self.known:
+                    continue
+                p = prototype.match(infinitive)
+                if p is None or _conjugation(p.label) != conjugation:
+                    continue
+                analysis = (infinitive, tense, person)
+                if analysis in results:
+                    continue
+                paradigm = conjugators.conjugate(p.label, infinitive)
+                if paradigm is None:
+                    continue
+                if form in _forms_for(paradigm, tense, person):
+                    results.append(analysis)
+        return sorted(results)
+
+# The alternative forms of one tense and person of a Paradigm.
+def _forms_for(paradigm, tense, person):
+    forms = paradigm[tense]
+    persons = dict(conjugators.TENSES)[tense]
+    if persons is None:
+        return forms
+    return forms[persons.index(person)]
@@ -1,19 +1,53 @@
-# Import some libraries we'll need.
-import matplotlib.pyplot as plt
-import pandas as pd
-import sqlite3
-import brewer2mpl
-from IPython.display import HTML
-
-# Generate some pretty colors for plots. The defaults are horrible.
-colors = brewer2mpl.get_map('Dark2', 'Qualitative', 8).mpl_colors
-
-# Connect to the database.
-conn = sqlite3.connect("lexique.sqlite3")
-
-# Run a simple SQL command and return the result.
-def sql(command, **kw):
-    return pd.read_sql(command, conn, **kw)
+# Helpers for our notebook, which loads them with '%run lexique.py'.  The
+# database code lives in lexique_db.py, and the plotting libraries are only
+# imported the first time we actually use them, so this stays cheap to
+# load from scripts.
+import importlib
+
+from lexique_db import connection, rows, arrays, sql, sql_cache
+
+# Stands in for a module until somebody looks inside it.
+class _LazyModule(object):
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+plt = _LazyModule('matplotlib.pyplot')
+pd = _LazyModule('pandas')
+
+# Generate some pretty colors for plots. The defaults are horrible.  We
+# compute these the first time they're used.
+class _LazyColors(object):
+    def __init__(self):
+        self._colors = None
+
+    def _load(self):
+        if self._colors is None:
+            import brewer2mpl
+            self._colors = \
+              brewer2mpl.get_map('Dark2', 'Qualitative', 8).mpl_colors
+        return self._colors
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def __getitem__(self, i):
+        return self._load()[i]
+
+colors = _LazyColors()
+
+# Display HTML in the notebook.
+def HTML(*args, **kw):
+    from IPython.display import HTML
+    return HTML(*args, **kw)
 
 # Save a pandas table as a TSV file.
 def save_tsv(name, data):
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+# Query our database without loading any heavy libraries.  This is the part
+# of lexique.py which scripts actually need, and it imports nothing but
+# sqlite3 until you ask for NumPy arrays or pandas DataFrames.
+#
+# From the command line, this runs a query and prints the results as TSV:
+#
+#     python lexique_db.py "SELECT * FROM verbe LIMIT 10"
+
+from __future__ import print_function
+import os
+import re
+import sys
+import threading
+
+import sqlite3
+
+# The database built by 'make'.
+DATABASE = "lexique.sqlite3"
+
+# Where sql() keeps the DataFrames it has already loaded, and how much
+# disk space they may use.
+SQL_CACHE_DIRECTORY = 'lexique-cache'
+SQL_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# SQLite connections can't be shared between threads, so we keep one per
+# thread, and open it the first time somebody needs it.
+_local = threading.local()
+
+# Return the database connection for the current thread, opening it if
+# necessary.
+def connection():
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = _local.conn = sqlite3.connect(DATABASE)
+    return conn
+
+# Run a SQL command and return the result as a list of tuples.
+def rows(command, params=()):
+    return connection().execute(command, params).fetchall()
+
+# Run a SQL command and return the result as a list of column names and a
+# list of tuples.
+def rows_with_names(command, params=()):
+    cursor = connection().execute(command, params)
+    names = [d[0] for d in cursor.description or []]
+    return (names, cursor.fetchall())
+
+# Run a SQL command and return a dictionary mapping each column name to a
+# NumPy array.
+def arrays(command, params=()):
+    import numpy as np
+    (names, result) = rows_with_names(command, params)
+    columns = zip(*result) if result else [()] * len(names)
+    return dict((name, np.array(column))
+                for (name, column) in zip(names, columns))
+
+# Identify the current contents of our database, as a short hex string.
+# We combine its size and modification time with the "file change
+# counter" in its header, which SQLite bumps on every write, so this
+# changes whenever 'make' rebuilds the database or anybody updates it.
+def database_version():
+    import struct
+    import hashlib
+    st = os.stat(DATABASE)
+    with open(DATABASE, 'rb') as f:
+        (counter,) = struct.unpack('>I', f.read(100)[24:28])
+    return hashlib.sha1('%d:%r:%d' % (st.st_size, st.st_mtime, counter)
+                        ).hexdigest()[:16]
+
+# Remove comments and collapse runs of whitespace outside of quoted
+# strings and identifiers, and drop any trailing semicolons, so that
+# reformatting a query doesn't miss the cache.  We have to remove '--'
+# comments before joining lines, or they'd swallow the rest of the query.
+# Queries typed in the notebook are UTF-8 byte strings, so we decode them
+# first, and always return unicode.
+_SQL_TOKEN = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\])
+                          |(?:--[^\n]*|/\*.*?(?:\*/|\Z)|\s)+""",
+                        re.DOTALL | re.VERBOSE)
+def normalize_sql(command):
+    if isinstance(command, str):
+        command = command.decode('utf-8')
+    command = _SQL_TOKEN.sub(lambda m: m.group(1) or u' ', command)
+    return re.sub(r'[\s;]+\Z', u'', command.strip())
+
+# Return the cache used by sql(), creating it the first time.  We import
+# it here so that scripts which never call sql() don't pay for it.
+_sql_cache = None
+def sql_cache():
+    global _sql_cache
+    if _sql_cache is None:
+        from cache import DiskCache
+        _sql_cache = DiskCache(SQL_CACHE_DIRECTORY, SQL_CACHE_MAX_BYTES)
+    return _sql_cache
+
+# Run a SQL command and return the result as a pandas DataFrame.  Any
+# keyword arguments are passed to pd.read_sql.
+#
+# Results are cached on disk in sql_cache(), keyed by the normalized query,
+# the keyword arguments and database_version(), so running the same query
+# after restarting the notebook just loads the saved DataFrame.  Pass
+# 'cache=False' to always run the query.  Queries with a 'chunksize'
+# return an iterator, so they're never cached.
+def sql(command, cache=True, **kw):
+    import pandas as pd
+    run = lambda: pd.read_sql(command, connection(), **kw)
+    if not cache or kw.get('chunksize') is not None:
+        return run()
+    key = (normalize_sql(command), sorted(kw.items()))
+    return sql_cache().get(key, run, version=database_version())
+
+# Print the results of a query as TSV, with a header line.
+def print_tsv(command, params=(), out=sys.stdout):
+    (names, result) = rows_with_names(command, params)
+    write = lambda fields: out.write(
+        (u'\t'.join(fields) + u'\n').encode('utf-8'))
+    write(names)
+    for row in result:
+        write([u'' if v is None else unicode(v) for v in row])
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print("Usage: python lexique_db.py <sql>", file=sys.stderr)
+        sys.exit(1)
+    print_tsv(sys.argv[1].decode('utf-8'))
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+# Load the raw Lexique380.txt file into the 'lexique' table of our SQLite
+# database.  This replaces an old iconv | tail | cut | .import pipeline,
+# which needed several external tools, only kept the first 10 columns and
+# loaded everything as TEXT.
+
+from __future__ import print_function
+import sys
+import io
+import time
+import argparse
+from itertools import islice
+
+import sqlite3
+
+from profiling import peak_memory_mb
+
+# The columns we know how to load, in the order they appear in our table.
+# Each entry is (name in the Lexique header, name in our table, SQL type).
+# The Lexique header numbers its columns ('1_ortho', '2_phon', ...), but we
+# ignore the numbers and look columns up by name.
+COLUMNS = [
+    ('ortho', 'ortho', 'TEXT'),
+    ('phon', 'phon', 'TEXT'),
+    ('lemme', 'lemme', 'TEXT'),
+    ('cgram', 'cgram', 'TEXT'),
+    ('genre', 'genre', 'TEXT'),
+    ('nombre', 'nombre', 'TEXT'),
+    ('freqlemfilms2', 'freqlemfilms2', 'REAL'),
+    ('freqlemlivres', 'freqlemlivres', 'REAL'),
+    ('freqfilms2', 'freqfilms2', 'REAL'),
+    ('freqlivres', 'freqlivres', 'REAL'),
+    ('infover', 'infover', 'TEXT'),
+    ('nbhomogr', 'nbhomogr', 'INTEGER'),
+    ('nbhomoph', 'nbhomoph', 'INTEGER'),
+    ('islem', 'islem', 'INTEGER'),
+    ('nblettres', 'nblettres', 'INTEGER'),
+    ('nbphons', 'nbphons', 'INTEGER'),
+    ('cvcv', 'cvcv', 'TEXT'),
+    ('p_cvcv', 'p_cvcv', 'TEXT'),
+    ('voisorth', 'voisorth', 'INTEGER'),
+    ('voisphon', 'voisphon', 'INTEGER'),
+    ('puorth', 'puorth', 'INTEGER'),
+    ('puphon', 'puphon', 'INTEGER'),
+    ('syll', 'syll', 'TEXT'),
+    ('nbsyll', 'nbsyll', 'INTEGER'),
+    ('cv-cv', 'cv_cv', 'TEXT'),
+    ('orthrenv', 'orthrenv', 'TEXT'),
+    ('phonrenv', 'phonrenv', 'TEXT'),
+    ('orthosyll', 'orthosyll', 'TEXT'),
+    ('cgramortho', 'cgramortho', 'TEXT'),
+    ('old20', 'old20', 'REAL'),
+    ('pld20', 'pld20', 'REAL'),
+    ('morphoder', 'morphoder', 'TEXT'),
+    ('nbmorph', 'nbmorph', 'INTEGER'),
+]
+
+# The columns we load unless told otherwise.  These are the 10 columns we
+# used to load, plus the phonological and syllable information.
+DEFAULT_COLUMNS = [
+    'ortho', 'phon', 'lemme', 'cgram', 'genre', 'nombre',
+    'freqlemfilms2', 'freqlemlivres', 'freqfilms2', 'freqlivres',
+    'nblettres', 'nbphons', 'syll', 'nbsyll', 'cv_cv', 'orthosyll',
+    'voisorth', 'voisphon', 'old20', 'pld20']
+
+# Settings which make bulk loading much faster.  We rebuild the database
+# from scratch if anything goes wrong, so we don't need a journal.
+PRAGMAS = [
+    'PRAGMA encoding = "UTF-8"',
+    'PRAGMA journal_mode = OFF',
+    'PRAGMA synchronous = OFF',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -65536',
+]
+
+# Convert a raw string to a Python value for the given SQL type.  Empty
+# numeric fields become NULL, but we keep empty strings for TEXT, because
+# createdb.sql groups on 'genre' and 'nombre', which are often empty.
+def _converter(sql_type):
+    if sql_type == 'TEXT':
+        return lambda value: value
+    convert = float if sql_type == 'REAL' else int
+    def parse(value):
+        if value == u'':
+            return None
+        return convert(value)
+    return parse
+
+# Figure out which columns of the input file we want, based on its header
+# line.  Returns a list of (index, table_column, sql_type) tuples.
+def _project(header, names):
+    positions = {}
+    for (i, field) in enumerate(header.rstrip(u'\r\n').split(u'\t')):
+        if field[:1].isdigit():
+            field = field.split(u'_', 1)[1]
+        positions[field] = i
+    by_name = dict((c[1], c) for c in COLUMNS)
+    projection = []
+    for name in names:
+        if name not in by_name:
+            raise ValueError("Unknown Lexique column: %s" % name)
+        (source, column, sql_type) = by_name[name]
+        if source not in positions:
+            raise ValueError("Column missing from input: %s" % source)
+        projection.append((positions[source], column, sql_type))
+    return projection
+
+# Stream rows from the Lexique file, decoding and converting as we go.
+# We skip blank lines, but complain about lines with too few fields, since
+# those mean the file is damaged.  'f' should be just past the header, so
+# our line numbers start at 2.
+def read_rows(f, projection):
+    converters = [(i, _converter(t)) for (i, _, t) in projection]
+    needed = max(i for (i, _, _) in projection) + 1
+    for (number, line) in enumerate(f, 2):
+        line = line.rstrip(u'\r\n')
+        if not line.strip():
+            continue
+        fields = line.split(u'\t')
+        if len(fields) < needed:
+            raise ValueError("Line %d has %d fields, but we need %d" %
+                             (number, len(fields), needed))
+        yield tuple(convert(fields[i]) for (i, convert) in converters)
+
+# Load 'source' into the 'lexique' table of 'conn', committing every
+# 'chunk_size' rows.  Returns the number of rows loaded.
+def load(conn, source, names=DEFAULT_COLUMNS, chunk_size=20000):
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    with io.open(source, encoding='iso-8859-15') as f:
+        projection = _project(f.readline(), names)
+        columns = ',\n'.join('%s %s' % (c, t) for (_, c, t) in projection)
+        conn.execute('DROP TABLE IF EXISTS lexique')
+        conn.execute('CREATE TABLE lexique (\n%s)' % columns)
+        insert = ('INSERT INTO lexique VALUES (%s)' %
+                  ', '.join('?' * len(projection)))
+        rows = read_rows(f, projection)
+        count = 0
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            conn.executemany(insert, chunk)
+            conn.commit()
+            count += len(chunk)
+    return count
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('source', help='the raw Lexique380.txt file')
+    parser.add_argument('database', help='the SQLite database to create')
+    parser.add_argument('--columns', default=','.join(DEFAULT_COLUMNS),
+                        help='comma-separated list of columns to load')
+    parser.add_argument('--chunk-size', type=int, default=20000,
+                        help='number of rows to insert per transaction')
+    args = parser.parse_args()
+
+    print("Loading %s..." % args.source, file=sys.stderr)
+    start = time.time()
+    conn = sqlite3.connect(args.database)
+    count = load(conn, args.source, args.columns.split(','), args.chunk_size)
+    conn.close()
+    elapsed = time.time() - start
+    print("Loaded %d rows in %.2fs (%.0f rows/sec, peak memory %.1f MB)" %
+          (count, elapsed, count / max(elapsed, 1e-6), peak_memory_mb()),
+          file=sys.stderr)
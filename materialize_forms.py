@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+# Generate every tense and person of every verb in 'verbe', using the
+# conjugator registered for its prototype, and store them in the 'forme'
+# table.  Verbs whose conjugator isn't implemented yet are conjugated from
+# their prototype's templates in verbs-0-2-0.xml instead.
+#
+# On a full Lexique database, this should take well under our time budget
+# of 60 seconds.
+
+from __future__ import print_function
+import sys
+import time
+import argparse
+from itertools import islice
+
+import sqlite3
+
+import conjugators
+import profiling
+
+# How long we expect this to take, in seconds.
+TIME_BUDGET = 60.0
+
+# Number of rows to insert per executemany call.
+BATCH_SIZE = 50000
+
+# Generate (lemme, temps, personne, forme) rows for each verb in 'verbs',
+# an iterable of (lemme, prototype) pairs.
+def generate_rows(verbs):
+    for (lemme, label) in verbs:
+        paradigm = conjugators.conjugate(label, lemme)
+        if paradigm is None:
+            continue
+        for (tense, person, form) in paradigm.forms():
+            yield (lemme, tense, person, form)
+
+# Insert 'rows' into 'forme' in batches.  Returns the number of rows.
+def _insert(conn, rows):
+    count = 0
+    while True:
+        with profiling.stage('materialize_forms: conjugating'):
+            batch = list(islice(rows, BATCH_SIZE))
+        if not batch:
+            break
+        with profiling.stage('materialize_forms: inserting'):
+            conn.executemany('INSERT INTO forme VALUES (?, ?, ?, ?)', batch)
+        count += len(batch)
+    return count
+
+# Replace the contents of 'forme' with freshly generated rows.  Returns the
+# number of rows inserted.
+def materialize(conn):
+    conn.execute('DROP INDEX IF EXISTS forme_lemme')
+    conn.execute('DROP INDEX IF EXISTS forme_forme')
+    conn.execute('DELETE FROM forme')
+    query = 'SELECT lemme, prototype FROM verbe WHERE prototype IS NOT NULL'
+    count = _insert(conn, generate_rows(conn.execute(query).fetchall()))
+
+    # Indexing after the bulk insert is much faster than maintaining the
+    # indices as we go.
+    with profiling.stage('materialize_forms: indexing'):
+        conn.execute('CREATE INDEX forme_lemme ON forme (lemme)')
+        conn.execute('CREATE INDEX forme_forme ON forme (forme)')
+        conn.commit()
+    return count
+
+# Regenerate the forms of just some verbs, leaving the rest of 'forme'
+# alone.  'verbs' is a list of (lemme, prototype) pairs, where 'prototype'
+# may be None if the verb no longer has one.  Returns the number of rows
+# inserted.
+def update(conn, verbs):
+    conn.executemany('DELETE FROM forme WHERE lemme = ?',
+                     [(lemme,) for (lemme, _) in verbs])
+    count = _insert(conn, generate_rows((lemme, label)
+                                        for (lemme, label) in verbs
+                                        if label is not None))
+    conn.commit()
+    return count
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--profile', metavar='FILE',
+                        help='write a JSON timing report to FILE')
+    args = parser.parse_args()
+    if args.profile:
+        profiling.enable(args.profile)
+
+    print("Materializing verb forms...", file=sys.stderr)
+    start = time.time()
+    conn = sqlite3.connect("lexique.sqlite3")
+    conn.execute('PRAGMA synchronous = OFF')
+    count = materialize(conn)
+    elapsed = time.time() - start
+    print("Stored %d forms in %.2fs (%.0f forms/sec)" %
+          (count, elapsed, count / max(elapsed, 1e-6)), file=sys.stderr)
+    if elapsed > TIME_BUDGET:
+        print("Warning: exceeded our time budget of %.0fs" % TIME_BUDGET,
+              file=sys.stderr)
@@ -1,41 +1,105 @@
 # -*- coding: utf-8 -*-
 
+# Fill in the 'prototype', 'aux' and 'conjugaison' columns of 'verbe', and
+# the 'conjugaison' table.  We work out everything in Python, bulk insert
+# it into a temporary staging table, and merge that into 'verbe' with a
+# single UPDATE, all in one transaction.  This is safe to run again.
+#
+# build.py calls munge() with prototypes from a previous build when the
+# prototypes haven't changed.
+
 from __future__ import print_function
 
 import sys
+import time
+import argparse
 import sqlite3
 import prototype
 import conjugators
+import profiling
+
+# Settings for our one big transaction.  Unlike load_lexique.py, we keep
+# the journal, because we update an existing database.
+PRAGMAS = [
+    'PRAGMA synchronous = OFF',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -65536',
+]
+
+# Copy the 'prototype', 'aux' and 'conjugaison' columns from our staging
+# table into 'verbe'.  Verbs which aren't in the staging table no longer
+# match any prototype, so they get NULLs.
+MERGE = """
+UPDATE verbe
+  SET prototype =
+        (SELECT prototype FROM verbe_staging s WHERE s.lemme = verbe.lemme),
+      aux = (SELECT aux FROM verbe_staging s WHERE s.lemme = verbe.lemme),
+      conjugaison =
+        (SELECT conjugaison FROM verbe_staging s WHERE s.lemme = verbe.lemme)"""
+
+# Return a list of (lemme, prototype) pairs for every verb in 'verbe' with
+# a prototype, most frequent first.
+def match_prototypes(conn):
+    matches = []
+    for (verb,) in conn.execute(
+            'SELECT lemme FROM verbe ORDER BY freqfilms2 DESC'):
+        p = prototype.match(verb)
+        if p is not None:
+            matches.append((verb, p))
+    return matches
+
+# Update 'conn' in one transaction, using 'matches' from match_prototypes
+# if we have them.  Returns the number of verbs with a prototype.
+def munge(conn, matches=None):
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+
+    # Figure out what prototype goes with each verb.
+    if matches is None:
+        with profiling.stage('munge_data: matching prototypes'):
+            matches = match_prototypes(conn)
+
+    # Give nice names to our conjugators.  This needs all the verbs, so we
+    # can't name the conjugator for each verb until we've matched them all.
+    with profiling.stage('munge_data: naming conjugators'):
+        frequencies = dict(conn.execute('SELECT lemme, freqfilms2 FROM verbe'))
+        conjugators.choose_example_verbs((p.label, verb, frequencies[verb])
+                                         for (verb, p) in matches)
+        names = {}
+        for (verb, p) in matches:
+            if p.label not in names:
+                names[p.label] = conjugators.BY_LABEL[p.label].name()
+        summaries = [(c.name(), c.like(), c.summarize())
+                     for c in conjugators.ALL]
+
+    with profiling.stage('munge_data: writing'):
+        conn.execute("""CREATE TEMP TABLE IF NOT EXISTS verbe_staging (
+                          lemme TEXT PRIMARY KEY,
+                          prototype TEXT,
+                          aux TEXT,
+                          conjugaison TEXT)""")
+        conn.execute('DELETE FROM verbe_staging')
+        conn.executemany('INSERT INTO verbe_staging VALUES (?, ?, ?, ?)',
+                         [(verb, p.label, p.aux, names[p.label])
+                          for (verb, p) in matches])
+        conn.execute(MERGE)
+        conn.execute('DELETE FROM conjugaison')
+        conn.executemany("INSERT INTO conjugaison VALUES (?, ?, ?)",
+                         summaries)
+        conn.commit()
+    return len(matches)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--profile', metavar='FILE',
+                        help='write a JSON timing report to FILE')
+    args = parser.parse_args()
+    if args.profile:
+        profiling.enable(args.profile)
 
-# Open our database.
-conn = sqlite3.connect("lexique.sqlite3")
-
-# Figure out what prototype goes with each verb.
-print("Determining verb prototypes...", file=sys.stderr)
-verb_prototypes = []
-for row in conn.execute('SELECT lemme FROM verbe'):
-    verb = row[0]
-    for p in prototype.PROTOTYPES:
-        if p.matches(verb):
-            verb_prototypes.append((p.label, p.aux, verb))
-            break
-sql = "UPDATE verbe SET prototype = ?, aux = ? WHERE lemme = ?"
-conn.executemany(sql, verb_prototypes)
-
-# Give nice names to our conjugators.
-print("Determining verb conjugators...", file=sys.stderr)
-conjugators.register_verbs_from_database(conn)
-conn.executemany("INSERT INTO conjugaison VALUES (?, ?, ?)",
-                 [(c.name(), c.like(), c.summarize()) for c in conjugators.ALL])
-
-# Figure out what conjugator goes with each verb.
-print("Matching conjugators to verbs...", file=sys.stderr)
-verb_conjugators = []
-for row in conn.execute('SELECT DISTINCT prototype FROM verbe'):
-    label = row[0]
-    verb_conjugators.append((conjugators.BY_LABEL[label].name(), label))
-conn.executemany('UPDATE verbe SET conjugaison = ? WHERE prototype = ?',
-                 verb_conjugators)
-
-# Commit our changes.
-conn.commit()
+    print("Matching verbs to prototypes and conjugators...", file=sys.stderr)
+    start = time.time()
+    count = munge(sqlite3.connect("lexique.sqlite3"))
+    elapsed = time.time() - start
+    print("Updated %d verbs in %.2fs (%.0f rows/sec)" %
+          (count, elapsed, count / max(elapsed, 1e-6)), file=sys.stderr)
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+# Find orthographic or phonological neighbours of words in Lexique.  This
+# replaces the pairwise comparisons in voisins1.pl and voisins2.pl with a
+# deletion-neighbourhood index: two words within edit distance k always
+# share some string obtained by deleting at most k characters from each,
+# so we only need to compare words which share such a string.
+#
+#     >>> index = NeighbourIndex.from_database(conn, 'ortho')
+#     >>> index.neighbours(u'chat')
+#
+# To compute the neighbourhood density of every word in one go:
+#
+#     python neighbours.py --column phon --distance 1 > densities.tsv
+
+from __future__ import print_function
+import sys
+import argparse
+from collections import defaultdict
+
+import sqlite3
+
+# Every string obtained by deleting up to 'k' characters from 'word'.
+def deletions(word, k):
+    results = set([word])
+    frontier = [word]
+    for i in range(k):
+        next_frontier = []
+        for w in frontier:
+            for j in range(len(w)):
+                d = w[:j] + w[j+1:]
+                if d not in results:
+                    results.add(d)
+                    next_frontier.append(d)
+        frontier = next_frontier
+    return results
+
+# The Levenshtein distance between 'a' and 'b', or k+1 if it's more than k.
+def bounded_distance(a, b, k):
+    if abs(len(a) - len(b)) > k:
+        return k + 1
+    previous = range(len(b) + 1)
+    for (i, ca) in enumerate(a):
+        current = [i + 1]
+        for (j, cb) in enumerate(b):
+            current.append(min(previous[j+1] + 1, current[j] + 1,
+                               previous[j] + (ca != cb)))
+        if min(current) > k:
+            return k + 1
+        previous = current
+    return previous[-1]
+
+class NeighbourIndex(object):
+    # Index 'words' for queries up to edit distance 'max_distance'.
+    def __init__(self, words, max_distance=1):
+        self.words = sorted(set(words))
+        self.max_distance = max_distance
+        self.index = defaultdict(list)
+        for (i, word) in enumerate(self.words):
+            for d in deletions(word, max_distance):
+                self.index[d].append(i)
+        self.index = dict(self.index)
+
+    # Index every distinct value of 'column' in the 'lexique' table.
+    @classmethod
+    def from_database(klass, conn, column='ortho', max_distance=1):
+        query = "SELECT DISTINCT %s FROM lexique WHERE %s != ''" % \
+            (column, column)
+        return klass([row[0] for row in conn.execute(query)], max_distance)
+
+    # All indexed words within edit distance 'k' of 'word', not including
+    # 'word' itself.
+    def neighbours(self, word, k=None):
+        if k is None:
+            k = self.max_distance
+        if k > self.max_distance:
+            raise ValueError("Index only supports distances up to %d" %
+                             self.max_distance)
+        candidates = set()
+        for d in deletions(word, k):
+            candidates.update(self.index.get(d, ()))
+        return sorted(self.words[i] for i in candidates
+                      if self.words[i] != word and
+                      bounded_distance(word, self.words[i], k) <= k)
+
+    # The number of neighbours of every indexed word, as a dictionary.
+    def densities(self, k=None):
+        return dict((word, len(self.neighbours(word, k)))
+                    for word in self.words)
+
+# Count neighbours which differ by exactly one substituted letter, the
+# classic definition used by Lexique's 'voisorth' and 'voisphon' columns.
+# Returns a dictionary mapping each word to its count.
+def substitution_densities(words):
+    words = set(words)
+    patterns = defaultdict(int)
+    for word in words:
+        for i in range(len(word)):
+            patterns[(word[:i], word[i+1:])] += 1
+    return dict((word, sum(patterns[(word[:i], word[i+1:])] - 1
+                           for i in range(len(word))))
+                for word in words)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--column', default='ortho', choices=['ortho', 'phon'])
+    parser.add_argument('--distance', type=int, default=1,
+                        help='maximum Levenshtein distance')
+    parser.add_argument('--substitutions', action='store_true',
+                        help='only count single-letter substitutions')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect("lexique.sqlite3")
+    if args.substitutions:
+        words = [row[0] for row in conn.execute(
+            "SELECT DISTINCT %s FROM lexique WHERE %s != ''" %
+            (args.column, args.column))]
+        densities = substitution_densities(words)
+    else:
+        index = NeighbourIndex.from_database(conn, args.column, args.distance)
+        densities = index.densities()
+    out = sys.stdout
+    for word in sorted(densities):
+        out.write((u'%s\t%d\n' % (word, densities[word])).encode('utf-8'))
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+# Optional instrumentation for our build scripts.  Set LEXIQUE_PROFILE to
+# the name of a JSON file, or pass '--profile FILE' to build.py,
+# munge_data.py, materialize_forms.py or analyze_prototypes.py, and we
+# record the wall time, call count and peak memory of each pipeline stage
+# and each Conjugator method, and write them out when the program exits:
+#
+#     LEXIQUE_PROFILE=profile.json python build.py --full
+#
+# Function times include time spent in the functions they call, and peak
+# memory is the peak for the whole process at the end of the last call.
+# Setting the environment variable also records work done while importing
+# modules, like loading our prototypes; the flag only starts once the
+# script has parsed its arguments.  Work done by worker processes isn't
+# recorded.
+#
+# When profiling is off, a stage costs one function call, and we don't
+# wrap any functions at all.
+
+from __future__ import print_function
+import os
+import sys
+import json
+import time
+import atexit
+import inspect
+import resource
+import functools
+from collections import OrderedDict
+
+# The environment variable which turns on profiling.
+ENV_VAR = 'LEXIQUE_PROFILE'
+
+# Where to write our report, or None if profiling is off.
+_report_path = None
+_start = None
+
+# Maps stage and function names to [calls, seconds, peak memory].
+_stages = OrderedDict()
+_functions = {}
+
+# Things to instrument once profiling is turned on.
+_pending = []
+
+# Peak memory use of this process, in megabytes.  Linux reports ru_maxrss
+# in kilobytes, but Mac OS X reports it in bytes.
+def peak_memory_mb():
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return maxrss / (1024.0 * 1024.0)
+    return maxrss / 1024.0
+
+def enabled():
+    return _report_path is not None
+
+def _record(table, name, seconds):
+    entry = table.get(name)
+    if entry is None:
+        entry = table[name] = [0, 0.0, 0.0]
+    entry[0] += 1
+    entry[1] += seconds
+    entry[2] = peak_memory_mb()
+
+class _Stage(object):
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, *exc_info):
+        _record(_stages, self.name, time.time() - self.start)
+
+class _NullStage(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+_NULL_STAGE = _NullStage()
+
+# Time a pipeline stage:
+#
+#     with profiling.stage('munge_data: merging'):
+#         ...
+def stage(name):
+    if _report_path is None:
+        return _NULL_STAGE
+    return _Stage(name)
+
+def _wrap(name, function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.time()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _record(_functions, name, time.time() - start)
+    wrapper._profiled = True
+    return wrapper
+
+def _when_enabled(callback):
+    if _report_path is None:
+        _pending.append(callback)
+    else:
+        callback()
+
+def _all_subclasses(klass):
+    found = [klass]
+    for subclass in klass.__subclasses__():
+        for k in _all_subclasses(subclass):
+            if k not in found:
+                found.append(k)
+    return found
+
+def _instrument_class(klass):
+    for k in _all_subclasses(klass):
+        for (name, value) in list(k.__dict__.items()):
+            if (inspect.isfunction(value) and not name.startswith('__') and
+                    not getattr(value, '_profiled', False)):
+                setattr(k, name, _wrap('%s.%s' % (k.__name__, name), value))
+
+# Record calls to every method of 'klass' and all of its subclasses.  Call
+# this once the subclasses have all been defined.
+def instrument_class(klass):
+    _when_enabled(lambda: _instrument_class(klass))
+
+def _instrument_functions(module_name, names):
+    module = sys.modules[module_name]
+    for name in names:
+        function = getattr(module, name)
+        if not getattr(function, '_profiled', False):
+            setattr(module, name, _wrap('%s.%s' % (module_name, name),
+                                        function))
+
+# Record calls to the functions 'names' in the module 'module_name'.  This
+# only catches calls which look the function up in the module.
+def instrument_functions(module_name, names):
+    _when_enabled(lambda: _instrument_functions(module_name, names))
+
+# Turn on profiling, and write a report to 'path' when we exit.
+def enable(path):
+    global _report_path, _start
+    if _report_path is None:
+        _start = time.time()
+        atexit.register(write_report)
+    _report_path = path
+    for callback in _pending:
+        callback()
+    del _pending[:]
+
+def _entries(table, names):
+    return [OrderedDict([('name', name), ('calls', table[name][0]),
+                         ('seconds', table[name][1]),
+                         ('peak_memory_mb', table[name][2])])
+            for name in names]
+
+# Everything we've recorded so far.  Stages are listed in the order they
+# first ran, and functions with the slowest first.
+def report():
+    functions = sorted(_functions, key=lambda name: -_functions[name][1])
+    return OrderedDict([
+        ('command', sys.argv),
+        ('seconds', time.time() - _start if _start is not None else 0.0),
+        ('peak_memory_mb', peak_memory_mb()),
+        ('stages', _entries(_stages, list(_stages))),
+        ('functions', _entries(_functions, functions)),
+    ])
+
+def write_report(path=None):
+    path = path or _report_path
+    with open(path, 'w') as f:
+        json.dump(report(), f, indent=2)
+        f.write('\n')
+    print("Wrote profile to %s" % path, file=sys.stderr)
+
+if os.environ.get(ENV_VAR):
+    enable(os.environ[ENV_VAR])
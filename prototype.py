@@ -1,15 +1,28 @@
 # -*- coding: utf-8 -*-
 
+import os
 import re
-import xml.etree.ElementTree as ET
+import marshal
+import threading
 
-# A verb prototype.  Loaded from XML.
-class Prototype:
+import profiling
+
+# The XML file we load our prototypes from, and a cache of its parsed
+# contents.
+XML_PATH = 'verbs-0-2-0.xml'
+CACHE_PATH = 'verbs-0-2-0.cache'
+
+# Bump this if the format of the cache changes.
+_CACHE_VERSION = 1
+
+# A verb prototype.  Loaded from XML, or from a dictionary of XML
+# attributes.
+class Prototype(object):
     def __init__(self, element):
         regex = element.get('REGEX')
         self.label = regex.replace("(?'c'", "(")
-        new_regex = "(?:%s)$" % regex.replace("(?'c'", "(?P<c>")
-        self.regex = re.compile(new_regex)
+        self._regex_source = "(?:%s)$" % regex.replace("(?'c'", "(?P<c>")
+        self._regex = None
         self.infinitive = element.get('INFINITIVE')
         self.notes = element.get('NOTES')
         self.radical = element.get('RADICAL')
@@ -26,6 +39,23 @@ class Prototype:
         self.imperatif = element.get(u'IMPÉRATIF')
         self.condition = element.get('CONDITION')
 
+    # Compile our regex the first time somebody needs it.  Most of the
+    # time, prototype.match can answer without it.
+    @property
+    def regex(self):
+        if self._regex is None:
+            self._regex = re.compile(self._regex_source)
+        return self._regex
+
+    # Describe our regex as a list of (anchored, endings) pairs, one for
+    # each '|'-separated branch, or return None if it's too complicated for
+    # that.  See _parse_branch.
+    def branches(self):
+        branches = [_parse_branch(b) for b in self.label.split('|')]
+        if None in branches:
+            return None
+        return branches
+
     def matches(self, infinitive):
         return self.regex.match(infinitive)
 
@@ -73,11 +103,158 @@ class Prototype:
     def example_subjunctive_imperfect(self):
         return self.generate_forms('simparfait')
 
-# Load our verb prototypes from XML.
-_conjugator = ET.parse('verbs-0-2-0.xml').getroot()
-PROTOTYPES = [Prototype(p) for p in _conjugator.findall('Prototype')]
+# Parse one '|'-separated branch of a prototype regex into a list of
+# literal endings (one for each way of filling in its character classes),
+# plus a flag saying whether the branch starts with '.*'.  Every regex in
+# verbs-0-2-0.xml is built from literals, '[...]' classes and the 'c'
+# group, so we return None for anything fancier and let the caller fall
+# back to the real regex.
+def _parse_branch(branch):
+    anchored = not branch.startswith('.*')
+    if not anchored:
+        branch = branch[2:]
+    endings = [u'']
+    i = 0
+    while i < len(branch):
+        ch = branch[i]
+        if branch.startswith("(?'c'[", i):
+            close = branch.find('])', i)
+            chars, i = branch[i+6:close], close + 2
+        elif branch.startswith('([', i):
+            close = branch.find('])', i)
+            chars, i = branch[i+2:close], close + 2
+        elif ch == '[':
+            close = branch.find(']', i)
+            chars, i = branch[i+1:close], close + 1
+        elif ch in '.^$*+?{}()\\|':
+            return None
+        else:
+            chars, i = ch, i + 1
+        if not chars or '-' in chars or '^' in chars or '\\' in chars:
+            return None
+        endings = [e + c for e in endings for c in chars]
+    return (anchored, endings)
+
+# A node in a trie of reversed verb endings.  'suffix' holds the index of
+# the first prototype whose '.*ending' branch ends here, and 'exact' the
+# first prototype whose literal branch ends here.
+class _Node(object):
+    __slots__ = ('children', 'suffix', 'exact')
+
+    def __init__(self):
+        self.children = {}
+        self.suffix = None
+        self.exact = None
+
+# Finds the first prototype matching an infinitive with a single pass over
+# the infinitive's letters, from the end.  This gives the same answer as
+# calling Prototype.matches on each prototype in order, because we always
+# keep the lowest prototype index we see.
+class Dispatcher(object):
+    def __init__(self, prototypes):
+        self.prototypes = prototypes
+        self.root = _Node()
+        self.fallback = []
+        for (index, p) in enumerate(prototypes):
+            branches = p.branches()
+            if branches is None:
+                self.fallback.append(index)
+                continue
+            for (anchored, endings) in branches:
+                for ending in endings:
+                    self._add(index, anchored, ending)
+
+    def _add(self, index, anchored, ending):
+        node = self.root
+        for ch in reversed(ending):
+            node = node.children.setdefault(ch, _Node())
+        attr = 'exact' if anchored else 'suffix'
+        if getattr(node, attr) is None:
+            setattr(node, attr, index)
+
+    # Return the index of the first matching prototype, or None.
+    def match_index(self, infinitive):
+        best = None
+        node = self.root
+        for ch in reversed(infinitive):
+            if node.suffix is not None and (best is None or node.suffix < best):
+                best = node.suffix
+            node = node.children.get(ch)
+            if node is None:
+                break
+        else:
+            for index in (node.suffix, node.exact):
+                if index is not None and (best is None or index < best):
+                    best = index
+        for index in self.fallback:
+            if best is not None and index > best:
+                break
+            if self.prototypes[index].matches(infinitive):
+                return index
+        return best
+
+    # Return the first matching prototype, or None.
+    def match(self, infinitive):
+        index = self.match_index(infinitive)
+        if index is None:
+            return None
+        return self.prototypes[index]
+
+# Parse the XML file, returning a list of attribute dictionaries, one for
+# each prototype.
+def _parse_xml(path):
+    import xml.etree.ElementTree as ET
+    root = ET.parse(path).getroot()
+    return [dict(p.attrib) for p in root.findall('Prototype')]
+
+# Load the attributes of our prototypes, using our cache if it's still
+# valid.  The cache is keyed on the XML file's size and modification time,
+# and we quietly skip writing it if we can't.
+def _load_attributes(xml_path=XML_PATH, cache_path=CACHE_PATH):
+    st = os.stat(xml_path)
+    key = (_CACHE_VERSION, st.st_size, st.st_mtime)
+    try:
+        with open(cache_path, 'rb') as f:
+            (cached_key, attributes) = marshal.load(f)
+        if cached_key == key:
+            return attributes
+    except (IOError, OSError, EOFError, ValueError, TypeError):
+        pass
+
+    attributes = _parse_xml(xml_path)
+    try:
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            marshal.dump((key, attributes), f)
+        os.rename(tmp_path, cache_path)
+    except (IOError, OSError):
+        pass
+    return attributes
+
+# Load our verb prototypes.
+with profiling.stage('prototype: loading prototypes'):
+    PROTOTYPES = [Prototype(attrs) for attrs in _load_attributes()]
 
 # Allow looking up prototypes by label.
 BY_LABEL = {}
 for p in PROTOTYPES:
     BY_LABEL[p.label] = p
+
+# Find the prototype for an infinitive.  Same result as trying each of
+# PROTOTYPES in order, but much faster.
+# We build our dispatcher the first time it's needed, to keep importing
+# this module cheap.  Once built, it never changes, so only building it
+# needs a lock.
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+def match(infinitive):
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = Dispatcher(PROTOTYPES)
+    return _dispatcher.match(infinitive)
+
+# Record how long matching takes, if we're profiling.
+profiling.instrument_class(Prototype)
+profiling.instrument_functions(__name__, ['match'])
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+
+# A small JSON service for looking up word frequencies and conjugations,
+# meant to run locally behind our conjugation reference page.  Run it from
+# the top-level directory with:
+#
+#     python server.py --port 8000
+#
+# It answers:
+#
+#     /frequency/<lemme>   frequencies from 'lemme_simple' and 'lemme'
+#     /paradigm/<verb>     every form of a verb, using its conjugator
+#     /conjugators         summaries of all our conjugators
+#     /complete/<prefix>   the most frequent words starting with a prefix
+#     /stats               cache statistics
+#
+# Frequencies, paradigms and conjugator summaries go through a bounded LRU
+# cache.  Completions are already fast, so they skip it.
+
+from __future__ import print_function
+import sys
+import json
+import Queue
+import urllib
+import argparse
+import threading
+import BaseHTTPServer
+
+import prototype
+import conjugators
+import lexique_db
+from cache import LRUCache
+from autocomplete import Completer
+
+# Raised by our handlers when there's nothing to return.
+class NotFound(Exception):
+    pass
+
+# Raised when a request doesn't make sense.
+class BadRequest(Exception):
+    pass
+
+# Shared by all request threads.
+CACHE = LRUCache(max_size=4096)
+
+# Look up the frequency of a lemma, overall and by part of speech.
+def frequency(lemme):
+    if not lemme:
+        raise BadRequest(u'Missing lemme')
+    simple = lexique_db.rows(
+        'SELECT freqfilms2, freqlivres FROM lemme_simple WHERE lemme = ?',
+        (lemme,))
+    if not simple:
+        raise NotFound(u'Unknown lemme: %s' % lemme)
+    details = lexique_db.rows(
+        """SELECT cgram, genre, nombre, freqfilms2, freqlivres FROM lemme
+             WHERE lemme = ? ORDER BY freqfilms2 DESC""", (lemme,))
+    keys = ['cgram', 'genre', 'nombre', 'freqfilms2', 'freqlivres']
+    return {
+        'lemme': lemme,
+        'freqfilms2': simple[0][0],
+        'freqlivres': simple[0][1],
+        'cgrams': [dict(zip(keys, row)) for row in details],
+    }
+
+# Conjugate a verb.  Tenses with persons map each person to a list of
+# alternative forms, and participles are just lists of alternatives.  Verbs
+# without a working conjugator are conjugated from their prototype's
+# templates, and have a 'conjugator' of None.
+def paradigm(verb):
+    if not verb:
+        raise BadRequest(u'Missing verb')
+    p = prototype.match(verb)
+    forms = conjugators.conjugate(p.label, verb) if p is not None else None
+    if forms is None:
+        raise NotFound(u"Can't conjugate: %s" % verb)
+    conj = conjugators.BY_LABEL[p.label]
+    tenses = {}
+    for (tense, persons) in conjugators.TENSES:
+        if persons is None:
+            tenses[tense] = forms[tense]
+        else:
+            tenses[tense] = dict(zip(persons, forms[tense]))
+    return {
+        'infinitive': verb,
+        'prototype': p.label,
+        'aux': p.aux,
+        'conjugator': conj.name() if conj.IMPLEMENTED else None,
+        'tenses': tenses,
+    }
+
+# Summarize all of our conjugators, as stored by munge_data.py.
+def conjugator_summaries():
+    keys = ['nom', 'comme', 'resume']
+    rows = lexique_db.rows('SELECT nom, comme, resume FROM conjugaison')
+    return [dict(zip(keys, row)) for row in rows]
+
+# Complete a prefix, ignoring accents.  We build our completer the first
+# time somebody asks.
+_completer = None
+def complete(prefix):
+    global _completer
+    if _completer is None:
+        _completer = Completer.from_database(lexique_db.connection())
+    keys = ['mot', 'freqfilms2']
+    return [dict(zip(keys, c)) for c in _completer.complete(prefix or u'')]
+
+# Map the first component of a path to a function taking the rest.
+ROUTES = {
+    'frequency': lambda arg: CACHE.get(('frequency', arg),
+                                       lambda: frequency(arg)),
+    'paradigm': lambda arg: CACHE.get(('paradigm', arg),
+                                      lambda: paradigm(arg)),
+    'conjugators': lambda arg: CACHE.get(('conjugators',),
+                                         conjugator_summaries),
+    'complete': complete,
+    'stats': lambda arg: CACHE.stats(),
+}
+
+# Figure out how to answer a request for 'path'.  Returns an HTTP status
+# code and a JSON-serializable value.
+def respond(path):
+    parts = path.split('?', 1)[0].strip('/').split('/', 1)
+    route = ROUTES.get(parts[0])
+    if route is None:
+        return (404, {'error': 'No such endpoint'})
+    try:
+        arg = (urllib.unquote(parts[1]).decode('utf-8')
+               if len(parts) > 1 else None)
+    except UnicodeDecodeError:
+        return (400, {'error': 'Path is not valid UTF-8'})
+    try:
+        return (200, route(arg))
+    except NotFound as e:
+        return (404, {'error': e.args[0]})
+    except BadRequest as e:
+        return (400, {'error': e.args[0]})
+
+class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    # Set to True to log every request.
+    verbose = False
+
+    def do_GET(self):
+        (status, value) = respond(self.path)
+        body = json.dumps(value, ensure_ascii=False)
+        if isinstance(body, unicode):
+            body = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            BaseHTTPServer.BaseHTTPRequestHandler.log_message(
+                self, format, *args)
+
+# An HTTP server which answers requests with a fixed pool of worker
+# threads.  Each worker keeps its own database connection for as long as
+# the server runs, instead of opening a new one for every request, and
+# once 'backlog' requests are waiting, we stop accepting new ones until a
+# worker is free.
+class Server(BaseHTTPServer.HTTPServer):
+    def __init__(self, address, handler, threads=8, backlog=64):
+        BaseHTTPServer.HTTPServer.__init__(self, address, handler)
+        self._requests = Queue.Queue(backlog)
+        for i in range(threads):
+            worker = threading.Thread(target=self._work)
+            worker.daemon = True
+            worker.start()
+
+    # Called by serve_forever for each connection we accept.
+    def process_request(self, request, client_address):
+        self._requests.put((request, client_address))
+
+    def _work(self):
+        while True:
+            (request, client_address) = self._requests.get()
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+# Create a server, and make sure our conjugators have their names.
+def make_server(host='127.0.0.1', port=8000, threads=8):
+    conjugators.choose_example_verbs_from_database(lexique_db.connection())
+    return Server((host, port), Handler, threads)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--threads', type=int, default=8,
+                        help='number of worker threads')
+    parser.add_argument('--verbose', action='store_true',
+                        help='log every request')
+    args = parser.parse_args()
+
+    Handler.verbose = args.verbose
+    server = make_server(args.host, args.port, args.threads)
+    print("Listening on http://%s:%d/" % (args.host, args.port),
+          file=sys.stderr)
+    server.serve_forever()
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+# Look up words by their endings.  SQLite can't use an index for a query
+# like "ortho LIKE '%ment'", so we store each word reversed, index that,
+# and turn ending queries into range queries over the reversed column:
+#
+#     >>> words_ending_with(conn, u'ment', limit=10)
+#
+# Run this module after createdb.sql to add the reversed columns.
+
+from __future__ import print_function
+import sys
+import time
+
+import sqlite3
+
+# The tables and columns we reverse, and the name of each reversed column.
+REVERSED_COLUMNS = [
+    ('lexique', 'ortho', 'ortho_inverse'),
+    ('lemme_simple', 'lemme', 'lemme_inverse'),
+    ('verbe', 'lemme', 'lemme_inverse'),
+]
+
+def _reverse(s):
+    return s[::-1] if s is not None else None
+
+# Add and index a reversed copy of each column in REVERSED_COLUMNS.
+def build(conn):
+    conn.create_function('reverse', 1, _reverse)
+    for (table, column, inverse) in REVERSED_COLUMNS:
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(%s)' %
+                                                  table)]
+        if inverse not in columns:
+            conn.execute('ALTER TABLE %s ADD COLUMN %s TEXT' % (table, inverse))
+        conn.execute('UPDATE %s SET %s = reverse(%s)' %
+                     (table, inverse, column))
+        conn.execute('CREATE INDEX IF NOT EXISTS %s_%s ON %s (%s)' %
+                     (table, inverse, table, inverse))
+    conn.commit()
+
+# The range of reversed strings which correspond to words ending in
+# 'suffix'.
+def _reversed_range(suffix):
+    start = suffix[::-1]
+    return (start, start + u'\uffff')
+
+# Return (word, frequency) pairs for every word in 'lexique' ending with
+# 'suffix', most frequent first.  Homographs are combined.
+def words_ending_with(conn, suffix, corpus='films', limit=None):
+    freq = 'freqfilms2' if corpus == 'films' else 'freqlivres'
+    query = """SELECT ortho, SUM(%s) AS freq FROM lexique
+                 WHERE ortho_inverse >= ? AND ortho_inverse < ?
+                 GROUP BY ortho
+                 ORDER BY freq DESC, ortho""" % freq
+    if limit is not None:
+        query += ' LIMIT %d' % limit
+    return conn.execute(query, _reversed_range(suffix)).fetchall()
+
+# Like words_ending_with, but for lemmas in 'lemme_simple'.
+def lemmas_ending_with(conn, suffix, corpus='films', limit=None):
+    freq = 'freqfilms2' if corpus == 'films' else 'freqlivres'
+    query = """SELECT lemme, %s FROM lemme_simple
+                 WHERE lemme_inverse >= ? AND lemme_inverse < ?
+                 ORDER BY %s DESC, lemme""" % (freq, freq)
+    if limit is not None:
+        query += ' LIMIT %d' % limit
+    return conn.execute(query, _reversed_range(suffix)).fetchall()
+
+# Return the infinitives in 'verbe' ending with 'suffix', most frequent
+# first.
+def verbs_ending_with(conn, suffix):
+    query = """SELECT lemme FROM verbe
+                 WHERE lemme_inverse >= ? AND lemme_inverse < ?
+                 ORDER BY freqfilms2 DESC, lemme"""
+    return [row[0] for row in conn.execute(query, _reversed_range(suffix))]
+
+# Return the verbs in 'verbe' which prototype.match assigns to the
+# Prototype 'p', most frequent first.  We only look at verbs with the
+# right endings, so this doesn't scan the table unless the prototype's
+# regex is too complicated to describe by its endings.
+def verbs_for_prototype(conn, p):
+    import prototype
+    branches = p.branches()
+    if branches is None:
+        candidates = conn.execute('SELECT lemme, freqfilms2 FROM verbe')
+    else:
+        # Each branch finds its own verbs, so we sort them all at the end.
+        candidates = []
+        for (anchored, endings) in branches:
+            for ending in endings:
+                if anchored:
+                    candidates.extend(conn.execute(
+                        'SELECT lemme, freqfilms2 FROM verbe WHERE lemme = ?',
+                        (ending,)))
+                else:
+                    candidates.extend(conn.execute(
+                        """SELECT lemme, freqfilms2 FROM verbe
+                             WHERE lemme_inverse >= ? AND lemme_inverse < ?""",
+                        _reversed_range(ending)))
+    matches = set((verb, freq) for (verb, freq) in candidates
+                  if prototype.match(verb) is p)
+    return [verb for (verb, freq) in
+            sorted(matches, key=lambda m: (-(m[1] or 0.0), m[0]))]
+
+# Return the verbs in 'verbe' handled by the conjugator 'conj'.
+def verbs_for_conjugator(conn, conj):
+    import prototype
+    import conjugators
+    verbs = []
+    for p in prototype.PROTOTYPES:
+        if conjugators.BY_LABEL[p.label] is conj:
+            verbs.extend(verbs_for_prototype(conn, p))
+    return verbs
+
+if __name__ == '__main__':
+    print("Indexing word endings...", file=sys.stderr)
+    start = time.time()
+    build(sqlite3.connect("lexique.sqlite3"))
+    print("Indexed word endings in %.2fs" % (time.time() - start),
+          file=sys.stderr)
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+# Measure how much of some real French text is covered by the N most
+# frequent lemmas in Lexique.  For example:
+#
+#     python text_coverage.py --sizes 1000,2000,5000 book1.txt book2.txt
+#
+# We stream each file a line at a time, look up each token's lemmas, and
+# only keep a count of tokens for each (lemma rank, part of speech) pair,
+# so memory use doesn't depend on how much text we read.  Files are
+# processed in parallel.
+
+from __future__ import print_function
+import re
+import io
+import argparse
+import multiprocessing
+from collections import Counter
+
+import sqlite3
+
+# Words, including hyphenated words and an elided final apostrophe.
+TOKEN_RE = re.compile(u"[^\\W\\d_]+(?:-[^\\W\\d_]+)*'?", re.UNICODE)
+
+# Elided forms, and the words they stand for.
+ELISIONS = {
+    u"c'": u'ce', u"d'": u'de', u"j'": u'je', u"l'": u'le', u"m'": u'me',
+    u"n'": u'ne', u"s'": u'se', u"t'": u'te', u"qu'": u'que',
+    u"jusqu'": u'jusque', u"lorsqu'": u'lorsque', u"puisqu'": u'puisque',
+}
+
+# The rank we give tokens we can't find.
+UNKNOWN = 0
+
+# Group parts of speech the same way as compute_coverage.py.
+def simplify_cgram(cgram):
+    if cgram == 'AUX':
+        return 'VER'
+    return (cgram or '')[:3]
+
+# Build a dictionary mapping each lowercase form in 'lexique' to a (rank,
+# cgram) pair, where 'rank' is the best rank of any of its lemmas in
+# 'corpus', and 'cgram' is the part of speech of its most frequent reading.
+def build_lookup(conn, corpus='films'):
+    ranks = dict(conn.execute(
+        """SELECT lemme, rang FROM couverture
+             WHERE corpus = ? AND cgram IS NULL""", (corpus,)))
+    freq = 'freqfilms2' if corpus == 'films' else 'freqlivres'
+    best = {}
+    query = 'SELECT ortho, lemme, cgram, %s FROM lexique' % freq
+    for (ortho, lemme, cgram, f) in conn.execute(query):
+        ortho = ortho.lower()
+        rank = ranks.get(lemme)
+        if rank is None:
+            continue
+        f = f or 0.0
+        old = best.get(ortho)
+        if old is None:
+            best[ortho] = [rank, f, simplify_cgram(cgram)]
+        else:
+            old[0] = min(old[0], rank)
+            if f > old[1]:
+                old[1:] = [f, simplify_cgram(cgram)]
+    return dict((ortho, (rank, cgram))
+                for (ortho, (rank, f, cgram)) in best.iteritems())
+
+# Look up a single token, returning a list of (rank, cgram) pairs.  This is
+# usually just one pair, but we split unknown hyphenated words into parts.
+def lookup_token(lookup, token):
+    token = token.lower()
+    found = lookup.get(token)
+    if found is None and token.endswith(u"'"):
+        found = lookup.get(ELISIONS.get(token, token[:-1]))
+    if found is not None:
+        return [found]
+    if u'-' in token:
+        return [lookup.get(part, (UNKNOWN, None))
+                for part in token.split(u'-') if part]
+    return [(UNKNOWN, None)]
+
+# Count the tokens in a stream of lines.  Returns a Counter mapping (rank,
+# cgram) pairs to token counts.
+def count_lines(lookup, lines):
+    counts = Counter()
+    for line in lines:
+        line = line.replace(u'’', u"'")
+        for token in TOKEN_RE.findall(line):
+            for key in lookup_token(lookup, token):
+                counts[key] += 1
+    return counts
+
+# Our lookup table, shared with worker processes when they fork.
+_lookup = None
+
+def _count_file(args):
+    (path, encoding) = args
+    with io.open(path, encoding=encoding, errors='replace') as f:
+        return (path, count_lines(_lookup, f))
+
+# Count tokens in each file, using 'processes' workers.  Returns a Counter
+# for all the files together.
+def count_files(lookup, paths, encoding='utf-8', processes=None):
+    global _lookup
+    _lookup = lookup
+    total = Counter()
+    tasks = [(path, encoding) for path in paths]
+    if processes == 1 or len(paths) <= 1:
+        results = (_count_file(task) for task in tasks)
+        for (path, counts) in results:
+            total.update(counts)
+        return total
+    pool = multiprocessing.Pool(processes)
+    try:
+        for (path, counts) in pool.imap_unordered(_count_file, tasks):
+            total.update(counts)
+    finally:
+        pool.terminate()
+        pool.join()
+    return total
+
+# Summarize our counts.  Returns a list of (size, overall, by_cgram) tuples,
+# where 'overall' is the percentage of tokens covered by the 'size' most
+# frequent lemmas, and 'by_cgram' does the same for each part of speech.
+def summarize(counts, sizes):
+    total = sum(counts.values()) or 1
+    cgram_totals = Counter()
+    for ((rank, cgram), n) in counts.items():
+        if cgram is not None:
+            cgram_totals[cgram] += n
+    results = []
+    for size in sizes:
+        covered = Counter()
+        for ((rank, cgram), n) in counts.items():
+            if rank != UNKNOWN and rank <= size:
+                covered[cgram] += n
+        by_cgram = dict((cgram, 100.0 * covered[cgram] / cgram_totals[cgram])
+                        for cgram in cgram_totals)
+        results.append((size, 100.0 * sum(covered.values()) / total,
+                        by_cgram))
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('files', nargs='+', help='text files to analyze')
+    parser.add_argument('--sizes', default='250,500,1000,2000,4000,8000,16000',
+                        help='comma-separated vocabulary sizes to report')
+    parser.add_argument('--corpus', default='films', choices=['films', 'livres'],
+                        help='which Lexique frequencies to rank lemmas by')
+    parser.add_argument('--encoding', default='utf-8')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='number of worker processes (default: all cores)')
+    args = parser.parse_args()
+
+    lookup = build_lookup(sqlite3.connect("lexique.sqlite3"), args.corpus)
+    counts = count_files(lookup, args.files, args.encoding, args.processes)
+    sizes = [int(s) for s in args.sizes.split(',')]
+    results = summarize(counts, sizes)
+
+    total = sum(counts.values())
+    unknown = sum(n for ((rank, _), n) in counts.items() if rank == UNKNOWN)
+    print("%d tokens, %.1f%% not in Lexique" %
+          (total, 100.0 * unknown / max(total, 1)))
+    cgrams = sorted(results[0][2].keys()) if results else []
+    print('\t'.join(['size', 'all'] + cgrams))
+    for (size, overall, by_cgram) in results:
+        print('\t'.join([str(size), '%.1f' % overall] +
+                        ['%.1f' % by_cgram[c] for c in cgrams]))